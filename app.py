@@ -1,8 +1,13 @@
 import streamlit as st
-from pyvis.network import Network
+import copy
 import os
 import base64
 
+from chord_data import ProgressionLibrary
+from network_component import chord_network
+from network_render import DEFAULT_STYLE
+from transposition import KEYS, home_key, move_to_key, transposed_graph
+
 # Set the app to wide mode
 st.set_page_config(layout="wide", initial_sidebar_state="collapsed")
 
@@ -11,178 +16,73 @@ st.title("Blues Chord Progression Network")
 st.write("Explore chord progressions and transitions commonly used in Blues. Filter by specific chords to see direct relationships.")
 
 
-def create_chord_network(selected_chord=None, show_neighbors_only=True):
-    # Create network with physics
-    net = Network(height='1000px', width='100%', bgcolor='#071109', font_color='white')
-    #net.barnes_hut(gravity=-10000, central_gravity=0.4, spring_length=50)
-
-    
-    chords = {
-    'FMajor': {'type': 'I (Tonic)', 'color': '#4CAF50', 'related': {
-        #'G': 'Fourth progression (IV in Mixolydian)',
-        'BbMmajor': 'Modal interchange (borrowed from F minor)',
-        #'C': 'Fifth progression (V)',
-        #'C7': 'Dominant seventh resolving to F'
-    }},
-    'G': {'type': 'IV (Subdominant in F Mixolydian)', 'color': '#4CAF50', 'related': {
-        #'F': 'Subdominant return to tonic',
-        #'C': 'Fifth progression in G',
-        'BbMajor': 'Modal interchange from F minor (leading to BbM)',
-    }},
-    'BbMajor': {'type': 'Modal interchange', 'color': '#FF5722', 'related': {
-        'E': 'Neapolitan 6TH',
-        #'C': 'Resolution to dominant',
-    }},
-    'C+': {'type': 'V (Dominant)', 'color': '#4CAF50', 'related': {
-        #'F': 'Resolution to tonic (F)',
-        #'C7': 'Dominant seventh leading back to F',
-        #'AbM': 'Modal interchange leading to C',
-    }},
-    'Cdim': {'type': 'Dominant seventh', 'color': '#FFC107', 'related': {
-        'E': 'Secondary Diminished',
-    
-    }},
-    'Adim': {'type': 'Dominant seventh', 'color': '#9C27B0', 'related': {
-        'F': 'Resolution to tonic (F)',
-
-    }}, 
-    'AbMajor': {'type': 'Modal interchange', 'color': '#FFC107', 'related': {
-        'edge_color': '#FF5722',
-        #'C': 'Resolution to dominant (C)'
-        
-    }},
-
-    'Aminor': {'type': 'Modal interchange', 'color': '#4CAF50', 'related': {
-        'C': 'Resolution to dominant (C)'
-    }}, 
-    'DMinor': {'type': 'Modal interchange', 'color': '#4CAF50', 'related': {
-        'C': 'Resolution to dominant (C)'
-    }},
-    'E7': {'type': 'Modal interchange', 'color': '#4CAF50', 'related': {
-        'C': 'Resolution to dominant (C)'
-    }},
-    'G#°': {'type': 'Modal interchange', 'color': '#4CAF50', 'related': {
-        'C': 'Resolution to dominant (C)'
-    }},
-}
-    
-    # Filter nodes based on selection
-    if selected_chord and show_neighbors_only:
-        visible_chords = {selected_chord}
-        if selected_chord in chords:
-            # Add directly related chords
-            visible_chords.update(chords[selected_chord]['related'].keys())
-            # Add chords that have a relationship to the selected chord
-            for chord_name, data in chords.items():
-                if selected_chord in data['related']:
-                    visible_chords.add(chord_name)
-    else:
-        visible_chords = set(chords.keys())
-    
-    # Add nodes with enhanced tooltips
-    for chord_name, data in chords.items():
-        if chord_name in visible_chords:
-            tooltip = f"{chord_name} ({data['type']})\n"
-            if chord_name in chords and 'related' in chords[chord_name]:
-                tooltip += "\nRelated chords:\n"
-                for related, relation in chords[chord_name]['related'].items():
-                    tooltip += f"→ {related}: {relation}\n"
-            
-            net.add_node(chord_name,
-                        label=chord_name,
-                        title=tooltip,
-                        color=data['color'])
-    
-    # Add edges with visible labels
-    for chord_name, data in chords.items():
-        if chord_name in visible_chords:
-            for related_chord, transition in data['related'].items():
-                if related_chord in visible_chords:
-                    # Add edge with label and styling
-                    net.add_edge(chord_name, 
-                               related_chord, 
-                               title=transition,
-                               label=transition,
-                               font={'size': 14, 'color': 'white'},
-                               arrows={'to': {'enabled': True, 'type': 'arrow'}})
-    
-
-
-    # Configure additional network options for better visibility
-    net.set_options("""
-    const options = {
-        "nodes": {
-            "fixed": {
-                "x": false,
-                "y": false
-            },
-            "physics": true
-        },
-        "edges": {
-            "font": {
-                "size": 8,
-                "strokeWidth": 0,
-                "color": "white"
-            },
-            "smooth": {
-                "type": "continuous",
-                "roundness": 0.9
-            }
-        },
-        "physics": {
-            "enabled": true,
-            "stabilization": {
-                "enabled": true,
-                "iterations": 100,
-                "updateInterval": 50,
-                "onlyDynamicEdges": false,
-                "fit": true
-            },
-            "barnesHut": {
-                "gravitationalConstant": -2000,
-                "centralGravity": 0.1,
-                "springLength": 300,
-                "springConstant": 0.01,
-                "damping": 0.09,
-                "avoidOverlap": 1
-            },
-            "minVelocity": 0.75,
-            "maxVelocity": 30
-        },
-        "interaction": {
-            "dragNodes": true,
-            "dragView": true,
-            "zoomView": true,
-            "navigationButtons": false,
-            "hover": false
-        },
-        "manipulation": {
-            "enabled": false
-        }
-    }
-    """)
-    
-    return net
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+# One library per process: chord data files are compiled once and recompiled
+# only when the file changes on disk
+@st.cache_resource
+def get_progression_library():
+    return ProgressionLibrary()
+
+
+# The modal graph; if an edit to its file does not validate, report it and
+# keep showing the last version that loaded
+def load_chord_graph():
+    graph, error = get_progression_library().get_last_good(os.path.join(DATA_DIR, "modal_f.json"))
+    if graph is None:
+        st.error(str(error))
+        st.stop()
+    if error is not None:
+        st.error(f"{error} (showing the last version that loaded)")
+    return graph
+
+
+# Page style of this app: a taller, darker canvas with longer springs and
+# without the navigation buttons
+NETWORK_STYLE = copy.deepcopy(DEFAULT_STYLE)
+NETWORK_STYLE.update({'height': '1000px', 'bgcolor': '#071109', 'spring_length': 300})
+NETWORK_STYLE['options']['interaction']['navigationButtons'] = False
 
 
 # Create sidebar controls
 st.sidebar.header("Filter Controls")
 
-# Get all available chords for the dropdown
-all_chords = sorted(list(set([chord for chord in ["11", "A", "B", "C", "D", "E", "F", "G",
-                                                  "A7", "B7", "C7", "D7", "E7", "F7", "G7",
-                                                  "Am7", "Bm7", "Cm7", "Dm7", "Em7", "Fm7", "Gm7",
-                                                  "A9", "B9", "C9", "D9", "E9", "F9", "G9",
-                                                  "Adim", "Bdim", "Cdim", "Ddim", "Edim", "Fdim", "Gdim",
-                                                  "Bb7", "Eb7", "Ab7", "Db7", "Gb7", "Bbm7", "Ebm7",
-                                                  "Abm7", "Dbm7", "Gbm7", "Bb9", "Eb9", "Ab9", "Db9", "Gb9",
-                                                  "F#m7", "C#m7"]])))
+# Keep the focused chord when the key changes, moved to the new key
+def transpose_selection(base_graph, old_key):
+    chord = move_to_key(base_graph, st.session_state.get("selected_chord"), old_key, st.session_state.music_key)
+    if chord is not None:
+        st.session_state.selected_chord = chord
+
+
+# The modal graph is written in F; any other key transposes it
+base_graph = load_chord_graph()
+home = KEYS[home_key(base_graph)]
+key = st.sidebar.selectbox(
+    "Key:",
+    KEYS,
+    index=KEYS.index(home),
+    key="music_key",
+    on_change=transpose_selection,
+    args=(base_graph, st.session_state.get("music_key", home))
+)
+graph = transposed_graph(base_graph, key)
+
+# Chords of the graph for the dropdown, most central first
+all_chords = [graph.names[chord_id] for chord_id in (-graph.metrics['pagerank']).argsort(kind='stable')]
+
+
+# Clicking a chord in the network focuses it like picking it here
+def focus_clicked_chord(chord):
+    if chord in all_chords:
+        st.session_state.selected_chord = chord
 
 
 selected_chord = st.sidebar.selectbox(
     "Select a chord to focus on:",
     ["None"] + all_chords,
-    help="Choose a specific chord to see its relationships"
+    key="selected_chord",
+    help="Choose a specific chord to see its relationships, or click it in the network"
 )
 
 #show_neighbors = st.sidebar.checkbox(
@@ -205,13 +105,6 @@ st.sidebar.markdown("""
 <span style='color:#FF5722;'>**Substitution**</span>: Substitution lets you use different chords while still keeping the same harmonic direction or feeling.
 """, unsafe_allow_html=True)
 
-# Create and display network
-net = create_chord_network(
-    selected_chord if selected_chord != "None" else None#,
-   # show_neighbors
-)
-net.save_graph("chord_network.html")
-
 
 # Add legend with more detailed explanations
 #st.write("### Chord Types Legend")
@@ -228,9 +121,14 @@ with col4:
 with col5:
     st.markdown("🔵 **Dominant 9th**: Needs Resolving")
 
-# Save and display the network
-net.save_graph("chord_network.html")
-st.components.v1.html(open("chord_network.html", "r").read(), height=1000)
+# Display the network; the selected chord is shown with the chords it leads
+# to and the chords leading to it
+chord_network(
+    graph,
+    selected_chord if selected_chord != "None" else None,
+    style=NETWORK_STYLE,
+    on_select=focus_clicked_chord
+)
 
 # Clean up
 #if os.path.exists("chord_network.html"):
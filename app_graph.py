@@ -1,7 +1,23 @@
 import streamlit as st
-from pyvis.network import Network
 import os
-import base64
+import subprocess
+
+from chord_assets import AssetManifest
+from chord_diagrams import build_chord_diagrams, hover_diagram_map
+from chord_data import GENERATED, ProgressionLibrary
+from chord_paths import PathPlanner
+from chord_search import ChordIndex
+from chord_theory import generate_chord_graph
+from corpus_counts import CORPUS_CACHE_DIR, corpus_format, corpus_key, counts_path, load_counts, run_count_process
+from image_variants import ImageVariants
+from network_component import chord_network
+from network_render import DEFAULT_STYLE, render_network_html, view_key, visible_chord_ids
+from prerender import HTML_CACHE_DIR, start_prerender_process
+from progression_sampler import ProgressionSampler
+from progression_validator import ProgressionValidator
+from render_cache import DiskRenderCache, RenderCache
+from sprite_atlas import build_sprite_atlas
+from transposition import KEYS, home_key, move_to_key, transposed_graph
 
 # Set the app to wide mode
 st.set_page_config(layout="wide")
@@ -10,634 +26,290 @@ st.set_page_config(layout="wide")
 st.title("Blues Chord Progression Network")
 st.write("Explore chord progressions and transitions commonly used in Blues. Filter by specific chords to see direct relationships.")
 
-# Function to read image and return as base64
-def get_image_as_base64(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode('utf-8')
-
-
-def create_chord_network(selected_chord=None, show_neighbors_only=True):
-    # Create network with physics
-    net = Network(height='600px', width='100%', bgcolor='#222222', font_color='white')
-    net.barnes_hut(gravity=-5000, central_gravity=0.3, spring_length=200)
-    
-    progression = {
-        'E': {'type': 'I (Tonic)', 'color': '#4CAF50', 'related': {
-            'A': 'Fourth progression (IV)'}},
-            #'B': 'Fifth progression (V)',
-        'C#m7': {'type': 'Relative Minor', 'color': '#2196F3', 'related': {
-             'E': 'Relative Minor'    
-                 }},
-        'E7': {'type': 'Dominant substitution', 'color': '#9C27B0', 'related': {
-             'E': 'Dominant substitution'
-                 }},
-        'E9': {'type': 'Extended substitution', 'color': '#2196F3', 'related': {
-             'E': 'Extended substitution'
-                 }},
-        'Em7': {'type': 'Minor substitution', 'color': '#FF5722', 'related': {
-             'E': 'Minor substitution'
-                 }},
-        'E6': {'type': 'Sixth substitution', 'color': '#FFC107', 'related': {
-             'E': 'Sixth substitution'
-                 }},
-        'D7': {'type': 'Additional fourth progression', 'color': '#9C27B0', 'related': {
-             'E': 'Additional fourth progression (leading to A)'
-                 }},
-
-        'A': {'type': 'IV (Subdominant)', 'color': '#4CAF50', 'related': {
-            'B': 'Fifth progression (V) in terms of E'}},
-            #'E': 'Fifth progression (I)'}},
-        'D': {'type': 'Fourth progression of IV', 'color': '#FFC107', 'related': {
-            'A': 'Fourth progression (IV of IV)'}},
-        'F#m7': {'type': 'Relative minor of A', 'color': '#FF5722', 'related': {
-            'A': 'Relative minor'}},
-        'A7': {'type': 'Dominant substitution of A', 'color': '#9C27B0', 'related': {
-            'A': 'Dominant substitution'}},
-        'A9': {'type': 'Extended substitution of A', 'color': '#2196F3', 'related': {
-            'A': 'Extended substitution'}},
-        'Am7': {'type': 'Minor substitution of A', 'color': '#FF5722', 'related': {
-            'A': 'Minor substitution'}},
-        'A6': {'type': 'Sixth substitution of A', 'color': '#FFC107', 'related': {
-            'A': 'Sixth substitution'}},
-        'B7': {'type': 'Additional fifth progression', 'color': '#9C27B0', 'related': {
-            'A': 'Additional fifth progression (leading to B)'}},
-
-         'B': {'type': 'V (Dominant)', 'color': '#4CAF50', 'related': {
-            #'E': 'Fourth progression (I)',
-            'A': 'Fourth progression (leading to A)'}},
-        'F#': {'type': 'Fifth of V', 'color': '#FFC107', 'related': {
-            'B': 'Fifth progression (V of V)'}},
-        'G#m7': {'type': 'Relative minor of B', 'color': '#FF5722', 'related': {
-            'B': 'Relative minor'}},
-        'B7': {'type': 'Dominant substitution of B', 'color': '#9C27B0', 'related': {
-            'B': 'Dominant substitution'}},
-        'B9': {'type': 'Extended substitution of B', 'color': '#2196F3', 'related': {
-            'B': 'Extended substitution'}},
-        'Bm7': {'type': 'Minor substitution of B', 'color': '#FF5722', 'related': {
-            'B': 'Minor substitution'}},
-        'B6': {'type': 'Sixth substitution of B', 'color': '#FFC107', 'related': {
-            'B': 'Sixth substitution'}},
-        'A7': {'type': 'Additional fourth progression', 'color': '#9C27B0', 'related': {
-            'B': 'Additional fourth progression (leading to A)'}}
-    }
-
-    
-    # Define chord relationships with categories and transitions
-    chords = {
-        'E': {'type': 'Root of Custom Graph', 'color': '#2196F3', 'related': {
-            'E': 'Root Node',
-            'A7': 'Dominant base'
-        }},
-
-        'A9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'A7': 'Dominant base',
-            'D9': 'Fourth progression',
-            'E9': 'Fifth progression',
-            'Am7': 'Minor relationship'
-        }},
-        'B9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'B7': 'Dominant base',
-            'E9': 'Fourth progression',
-            'F#9': 'Fifth progression',
-            'Bm7': 'Minor relationship'
-        }},
-        'C9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'C7': 'Dominant base',
-            'F9': 'Fourth progression',
-            'G9': 'Fifth progression',
-            'Cm7': 'Minor relationship'
-        }},
-        'D9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'D7': 'Dominant base',
-            'G9': 'Fourth progression',
-            'A9': 'Fifth progression',
-            'Dm7': 'Minor relationship'
-        }},
-        'E9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'E7': 'Dominant base',
-            'A9': 'Fourth progression',
-            'B9': 'Fifth progression',
-            'Em7': 'Minor relationship'
-        }},
-        'F9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'F7': 'Dominant base',
-            'Bb9': 'Fourth progression',
-            'C9': 'Fifth progression',
-            'Fm7': 'Minor relationship'
-        }},
-
-        'G9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'G7': 'Dominant base',
-            'C9': 'Fourth progression',
-            'D9': 'Fifth progression',
-            'Gm7': 'Minor relationship'
-        }},
-
-        'Am7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Dm7': 'Fourth minor',
-            'E7': 'Dominant resolution',
-            'A7': 'Dominant substitution',
-            'Adim': 'Leading tone connection',
-            'A9': 'Extended relationship'
-        }},
-        'Bm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Em7': 'Fourth minor',
-            'Gb7': 'Dominant resolution',
-            'B7': 'Dominant substitution',
-            'B9': 'Extended relationship'
-        }},
-        
-        'Cm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Fm7': 'Fourth minor',
-            'G7': 'Dominant resolution',
-            'C7': 'Dominant substitution',
-            'C9': 'Extended relationship'
-        }},
-
-        'Dm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Gm7': 'Fourth minor',
-            'A7': 'Dominant resolution',
-            'D7': 'Dominant substitution',
-            'D9': 'Extended relationship'
-        }},
-        
-        'Em7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Am7': 'Fourth minor',
-            'B7': 'Dominant resolution',
-            'E7': 'Dominant substitution',
-            'E9': 'Extended relationship'
-        }},
-
-        'Fm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Bbm7': 'Fourth minor',
-            'C7': 'Dominant resolution',
-            'F7': 'Dominant substitution',
-            'F9': 'Extended relationship'
-        }},
-
-        'Gm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Cm7': 'Fourth minor',
-            'D7': 'Dominant resolution',
-            'G7': 'Dominant substitution',
-            'G9': 'Extended relationship'
-        }},
-
-        # Major chords (roots)
-        'A': {'type': 'Major', 'color': '#4CAF50', 'related': {
-            'A7': 'Dominant extension',
-            'D7': 'Fourth progression',
-            'E7': 'Fifth progression',
-            'F#m7': 'Relative minor',
-            'Am7': 'Minor substitution',
-            'Adim': 'Diminished tension'
-        }},
-        'B': {'type': 'Major', 'color': '#4CAF50', 'related': {
-            'B7': 'Dominant extension',
-            'E7': 'Fourth progression',
-            'Gb7': 'Fifth progression',
-            'G#m7': 'Relative minor',
-            'Bm7': 'Minor substitution',
-            'Bdim': 'Diminished tension'
-        }},
-
-        'C': {'type': 'Major', 'color': '#4CAF50', 'related': {
-            'C7': 'Dominant extension',
-            'F7': 'Fourth progression',
-            'G7': 'Fifth progression',
-            'Am7': 'Relative minor',
-            'Cm7': 'Minor substitution',
-            'Cdim': 'Diminished tension'
-        }},
-        'D': {'type': 'Major', 'color': '#4CAF50', 'related': {
-            'D7': 'Dominant extension',
-            'G7': 'Fourth progression',
-            'A7': 'Fifth progression',
-            'Bm7': 'Relative minor',
-            'Dm7': 'Minor substitution',
-            'Ddim': 'Diminished tension'
-        }},
-        'E': {'type': 'Major', 'color': '#4CAF50', 'related': {
-            'E7': 'Dominant extension',
-            'A7': 'Fourth progression',
-            'B7': 'Fifth progression',
-            'C#m7': 'Relative minor',
-            'Em7': 'Minor substitution',
-            'Edim': 'Diminished tension'
-        }},
-        
-            # Dominant 7th chords (essential for blues)
-        'A7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'D7': 'Fourth resolution',
-            'E7': 'Fifth resolution',
-            'Am7': 'Minor substitution',
-            'D9': 'Extended progression',
-            'Adim': 'Diminished tension',
-            'A9': 'Extension base'
-        }},
-        'B7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'E7': 'Fourth resolution',
-            'Gb7': 'Fifth resolution',
-            'Bm7': 'Minor substitution',
-            'E9': 'Extended progression',
-            'Bdim': 'Diminished tension',
-            'B9': 'Extension base'
-        }},
-        'C7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'F7': 'Fourth resolution',
-            'G7': 'Fifth resolution',
-            'Cm7': 'Minor substitution',
-            'F9': 'Extended progression',
-            'Cdim': 'Diminished tension',
-            'C9': 'Extension base'
-        }},
-        'D7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'G7': 'Fourth resolution',
-            'A7': 'Fifth resolution',
-            'Dm7': 'Minor substitution',
-            'G9': 'Extended progression',
-            'Ddim': 'Diminished tension',
-            'D9': 'Extension base'
-        }},
-        'E7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'A7': 'Fourth resolution',
-            'B7': 'Fifth resolution',
-            'Em7': 'Minor substitution',
-            'A9': 'Extended progression',
-            'Edim': 'Diminished tension',
-            'E9': 'Extension base'
-        }},
-        'F7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'Bb7': 'Fourth resolution',
-            'C7': 'Fifth resolution',
-            'Fm7': 'Minor substitution',
-            'Bb9': 'Extended progression',
-            'Fdim': 'Diminished tension',
-            'F9': 'Extension base'
-        }},
-        'G7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'C7': 'Fourth resolution',
-            'D7': 'Fifth resolution',
-            'Gm7': 'Minor substitution',
-            'C9': 'Extended progression',
-            'Gdim': 'Diminished tension',
-            'G9': 'Extension base'
-        }},
-        
-        # Minor 7th chords (for jazz blues and substitutions)
-        # Minor 7th chords (with harmonic functions)
-        'Am7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Dm7': 'Fourth minor',
-            'E7': 'Dominant resolution',
-            'A7': 'Dominant substitution',
-            'Adim': 'Leading tone connection'
-        }},
-        'Bm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Em7': 'Fourth minor',
-            'Gb7': 'Dominant resolution',
-            'B7': 'Dominant substitution'
-        }},
-        'Cm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Fm7': 'Fourth minor',
-            'G7': 'Dominant resolution',
-            'C7': 'Dominant substitution'
-        }},
-        'Dm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Gm7': 'Fourth minor',
-            'A7': 'Dominant resolution',
-            'D7': 'Dominant substitution'
-        }},
-        'Em7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Am7': 'Fourth minor',
-            'B7': 'Dominant resolution',
-            'E7': 'Dominant substitution'
-        }},
-        
-        # Diminished chords (for tension and transitions)
-        'Adim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'A7': 'Dominant resolution',
-            'D7': 'Fourth tension',
-            'E7': 'Fifth tension',
-            'Am7': 'Leading tone resolution'
-        }},
-        'Bdim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'B7': 'Dominant resolution',
-            'E7': 'Fourth tension',
-            'Gb7': 'Fifth tension'
-        }},
-        'Cdim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'C7': 'Dominant resolution',
-            'F7': 'Fourth tension',
-            'G7': 'Fifth tension'
-        }},
-        'Ddim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'D7': 'Dominant resolution',
-            'G7': 'Fourth tension',
-            'A7': 'Fifth tension'
-        }},
-        'Edim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'E7': 'Dominant resolution',
-            'A7': 'Fourth tension',
-            'B7': 'Fifth tension'
-        }},
-        'Fdim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'F7': 'Dominant resolution',
-            'Bb7': 'Fourth tension',
-            'C7': 'Fifth tension'
-        }},
-        'Gdim': {'type': 'Diminished', 'color': '#FFC107', 'related': {
-            'G7': 'Dominant resolution',
-            'C7': 'Fourth tension',
-            'D7': 'Fifth tension'
-        }},
-
-        # F#m7 chord with related harmonic functions
-        'F#m7': {'type': 'Minor 7th', 'color': '#FF9800', 'related': {
-            'A7': 'Dominant resolution',
-            'Dmaj7': 'Fourth major',
-            'E7': 'Fifth dominant',
-            'B7': 'Secondary dominant',
-            'F#dim': 'Diminished substitution'
-        }},
-
-        # C#m7 chord with related harmonic functions
-        'C#m7': {'type': 'Minor 7th', 'color': '#9C27B0', 'related': {
-            'E7': 'Dominant resolution',
-            'Amaj7': 'Fourth major',
-            'B7': 'Fifth dominant',
-            'G#7': 'Secondary dominant',
-            'C#dim': 'Diminished substitution'
-        }},
-
-        # Dm7 chord with related harmonic functions
-        'Dm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Fmaj7': 'Relative major',
-            'A7': 'Dominant resolution',
-            'G7': 'Fifth dominant',
-            'B♭7': 'Fourth progression',
-            'Ddim': 'Diminished substitution'
-            }},
-
-        # Em7 chord with related harmonic functions
-        'Em7': {'type': 'Minor 7th', 'color': '#3F51B5', 'related': {
-            'Gmaj7': 'Relative major',
-            'Cmaj7': 'Fourth progression',
-            'B7': 'Dominant resolution',
-            'A7': 'Fifth dominant',
-            'Edim': 'Diminished substitution'
-        }},
-
-        # Gm7 chord with related harmonic functions
-        'Gm7': {'type': 'Minor 7th', 'color': '#8BC34A', 'related': {
-            'B♭maj7': 'Relative major',
-            'F7': 'Dominant resolution',
-            'D7': 'Fifth dominant',
-            'C7': 'Fourth dominant',
-            'Gdim': 'Diminished substitution'
-        }},
-
-        # Am7 chord with related harmonic functions
-        'Am7': {'type': 'Minor 7th', 'color': '#FF9800', 'related': {
-            'Cmaj7': 'Relative major',
-            'E7': 'Dominant resolution',
-            'G7': 'Fifth dominant',
-            'D7': 'Fourth dominant',
-            'Adim': 'Diminished substitution'
-        }},
-
-        # Bm7 chord with related harmonic functions
-        'Bm7': {'type': 'Minor 7th', 'color': '#009688', 'related': {
-            'Dmaj7': 'Relative major',
-            'A7': 'Dominant resolution',
-            'E7': 'Fifth dominant',
-            'G7': 'Fourth dominant',
-            'Bdim': 'Diminished substitution'
-        }},
-
-        
-        'Bb7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'Eb7': 'Fourth resolution',
-            'F7': 'Fifth resolution',
-            'Bbm7': 'Minor substitution',
-            'Eb9': 'Extended progression',
-            'Bbdim': 'Diminished tension',
-            'Bb9': 'Extension base'
-        }},
-        'Eb7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'Ab7': 'Fourth resolution',
-            'Bb7': 'Fifth resolution',
-            'Ebm7': 'Minor substitution',
-            'Ab9': 'Extended progression',
-            'Ebdim': 'Diminished tension',
-            'Eb9': 'Extension base'
-        }},
-        'Ab7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'Db7': 'Fourth resolution',
-            'Eb7': 'Fifth resolution',
-            'Abm7': 'Minor substitution',
-            'Db9': 'Extended progression',
-            'Abdim': 'Diminished tension',
-            'Ab9': 'Extension base'
-        }},
-        'Db7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'Gb7': 'Fourth resolution',
-            'Ab7': 'Fifth resolution',
-            'Dbm7': 'Minor substitution',
-            'Gb9': 'Extended progression',
-            'Dbdim': 'Diminished tension',
-            'Db9': 'Extension base'
-        }},
-        'Gb7': {'type': 'Dominant 7th', 'color': '#9C27B0', 'related': {
-            'B7': 'Fourth resolution',
-            'Db7': 'Fifth resolution',
-            'Gbm7': 'Minor substitution',
-            'B9': 'Extended progression',
-            'Gbdim': 'Diminished tension',
-            'Gb9': 'Extension base'
-        }},
-        'Bbm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Ebm7': 'Fourth minor',
-            'F7': 'Dominant resolution',
-            'Bb7': 'Dominant substitution',
-            'Bb9': 'Extended relationship'
-        }},
-        'Ebm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Abm7': 'Fourth minor',
-            'Bb7': 'Dominant resolution',
-            'Eb7': 'Dominant substitution',
-            'Eb9': 'Extended relationship'
-        }},
-        'Abm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Dbm7': 'Fourth minor',
-            'Eb7': 'Dominant resolution',
-            'Ab7': 'Dominant substitution',
-            'Ab9': 'Extended relationship'
-        }},
-        'Dbm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Gbm7': 'Fourth minor',
-            'Ab7': 'Dominant resolution',
-            'Db7': 'Dominant substitution',
-            'Db9': 'Extended relationship'
-        }},
-        'Gbm7': {'type': 'Minor 7th', 'color': '#FF5722', 'related': {
-            'Bm7': 'Fourth minor',
-            'Db7': 'Dominant resolution',
-            'Gb7': 'Dominant substitution',
-            'Gb9': 'Extended relationship'
-        }},
-        'Bb9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'Bb7': 'Dominant base',
-            'Eb9': 'Fourth progression',
-            'F9': 'Fifth progression',
-            'Bbm7': 'Minor relationship'
-        }},
-        'Eb9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'Eb7': 'Dominant base',
-            'Ab9': 'Fourth progression',
-            'Bb9': 'Fifth progression',
-            'Ebm7': 'Minor relationship'
-        }},
-        'Ab9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'Ab7': 'Dominant base',
-            'Db9': 'Fourth progression',
-            'Eb9': 'Fifth progression',
-            'Abm7': 'Minor relationship'
-        }},
-        'Db9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'Db7': 'Dominant base',
-            'Gb9': 'Fourth progression',
-            'Ab9': 'Fifth progression',
-            'Dbm7': 'Minor relationship'
-        }},
-        'Gb9': {'type': 'Extended (9th)', 'color': '#2196F3', 'related': {
-            'Gb7': 'Dominant base',
-            'B9': 'Fourth progression',
-            'Db9': 'Fifth progression',
-            'Gbm7': 'Minor relationship'
-        }}
-     };
-    
-    chords = progression
-    
-    # Filter nodes based on selection
-    if selected_chord and show_neighbors_only:
-        visible_chords = {selected_chord}
-        if selected_chord in chords:
-            # Add directly related chords
-            visible_chords.update(chords[selected_chord]['related'].keys())
-            # Add chords that have a relationship to the selected chord
-            for chord_name, data in chords.items():
-                if selected_chord in data['related']:
-                    visible_chords.add(chord_name)
-    else:
-        visible_chords = set(chords.keys())
-    
-    # Add nodes with enhanced tooltips
-    for chord_name, data in chords.items():
-        if chord_name in visible_chords:
-            tooltip = f"{chord_name} ({data['type']})\n"
-            if chord_name in chords and 'related' in chords[chord_name]:
-                tooltip += "\nRelated chords:\n"
-                for related, relation in chords[chord_name]['related'].items():
-                    tooltip += f"→ {related}: {relation}\n"
-            
-            net.add_node(chord_name,
-                        label=chord_name,
-                        title=tooltip,
-                        color=data['color'])
-    
-    # Add edges with visible labels
-    for chord_name, data in chords.items():
-        if chord_name in visible_chords:
-            for related_chord, transition in data['related'].items():
-                if related_chord in visible_chords:
-                    # Add edge with label and styling
-                    net.add_edge(chord_name, 
-                               related_chord, 
-                               title=transition,
-                               label=transition,
-                               font={'size': 14, 'color': 'white'},
-                               arrows={'to': {'enabled': True, 'type': 'arrow'}})
-    
-
-
-    # Configure additional network options for better visibility
-    net.set_options("""
-    const options = {
-        "nodes": {
-            "fixed": {
-                "x": false,
-                "y": false
-            },
-            "physics": true
-        },
-        "edges": {
-            "font": {
-                "size": 8,
-                "strokeWidth": 0,
-                "color": "white"
-            },
-            "smooth": {
-                "type": "continuous",
-                "roundness": 0.9
-            }
-        },
-        "physics": {
-            "enabled": true,
-            "stabilization": {
-                "enabled": true,
-                "iterations": 100,
-                "updateInterval": 50,
-                "onlyDynamicEdges": false,
-                "fit": true
-            },
-            "barnesHut": {
-                "gravitationalConstant": -2000,
-                "centralGravity": 0.1,
-                "springLength": 200,
-                "springConstant": 0.01,
-                "damping": 0.09,
-                "avoidOverlap": 1
-            },
-            "minVelocity": 0.75,
-            "maxVelocity": 30
-        },
-        "interaction": {
-            "dragNodes": true,
-            "dragView": true,
-            "zoomView": true,
-            "navigationButtons": true,
-            "hover": false
-        },
-        "manipulation": {
-            "enabled": false
-        }
-    }
-    """)
-    
-    return net
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 
+# One library per process: chord data files are compiled once and recompiled
+# only when the file changes on disk
+@st.cache_resource
+def get_progression_library():
+    return ProgressionLibrary()
+
+
+# The generated graph only depends on the interval rules, so build it once
+@st.cache_resource
+def get_generated_graph():
+    return generate_chord_graph()
+
+
+# Vocabulary shown in the sidebar -> graph source (data file or generated)
+VOCABULARIES = {
+    "Blues progression (E)": os.path.join(DATA_DIR, "blues_progression.json"),
+    "All 12 keys (generated)": GENERATED,
+}
+
+
+def load_chord_graph(vocabulary="Blues progression (E)"):
+    source = VOCABULARIES[vocabulary]
+    if source == GENERATED:
+        return get_generated_graph()
+    graph, error = get_progression_library().get_last_good(source)
+    if graph is None:
+        st.error(str(error))
+        st.stop()
+    if error is not None:
+        st.error(f"{error} (showing the last version that loaded)")
+    return graph
+
+
+# Path search state (memoized routes, cost-to-target tables) lives as long as the graph
+@st.cache_resource
+def get_path_planner(version, _graph):
+    return PathPlanner(_graph)
+
+
+# Alias tables of the Markov chain over the graph, built once per graph
+@st.cache_resource
+def get_progression_sampler(version, _graph):
+    return ProgressionSampler(_graph)
+
+
+# Hashed edge set of the graph for checking pasted and uploaded progressions
+@st.cache_resource
+def get_progression_validator(version, _graph):
+    return ProgressionValidator(_graph)
+
+
+# Transition counts of a corpus file for a graph, counted by a pool of worker
+# processes the first time and read from .chord_cache/corpus/ afterwards
+@st.cache_resource
+def get_corpus_counts(version, source, music_key, corpus, key, _graph):
+    stored = counts_path(_graph, corpus, CORPUS_CACHE_DIR)
+    if not os.path.exists(stored):
+        run_count_process(source, corpus, CORPUS_CACHE_DIR, music_key)
+    return load_counts(_graph, stored)
+
+
+# One rendered-page cache per process, shared by all sessions, backed by the
+# on-disk page cache that the prerender workers fill
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(max_bytes=int(os.environ.get("CHORD_HTML_CACHE_MB", "64")) * 1024 * 1024,
+                       disk=DiskRenderCache(HTML_CACHE_DIR))
+
+
+# Chord images in images/ by chord ID, shared by all sessions. The manifest
+# watches the directory, so reruns do no image I/O until a file changes.
+@st.cache_resource
+def get_asset_manifest():
+    return AssetManifest()
+
+
+# Diagrams of the graph's chords packed into one image, built once per graph
+# and set of images
+@st.cache_resource
+def get_sprite_atlas(version, assets_version, _graph):
+    return build_sprite_atlas(get_asset_manifest(), _graph.names)
+
+
+# Downscaled copies of the images in images/ per display size, kept on disk
+@st.cache_resource
+def get_image_variants():
+    return ImageVariants(get_asset_manifest())
+
+
+# Generated SVG diagrams of every chord of the graph, for chords without an image
+@st.cache_resource
+def get_chord_diagrams(version, _graph):
+    return build_chord_diagrams(_graph.names)
+
+
+# URL of the map of diagrams shown when hovering a chord in the network
+@st.cache_resource
+def get_hover_diagrams(version, assets_version, _graph):
+    return hover_diagram_map(_graph.names, get_image_variants())
+
+
+# Type-ahead index over the graph's chords, in dropdown order
+@st.cache_resource
+def get_chord_index(version, _graph):
+    pagerank = _graph.metrics['pagerank']
+    return ChordIndex(_graph.names[chord_id] for chord_id in (-pagerank).argsort(kind='stable'))
+
+
+# "component" keeps one live network per session and sends only what changed;
+# "static" renders a complete page per view through the page caches
+NETWORK_MODE = os.environ.get("CHORD_NETWORK_MODE", "component")
+
+
+# Render every chord view of a graph in a background process pool, once per
+# graph version; finished pages are picked up from the disk cache
+@st.cache_resource
+def start_prerender(version, source):
+    return start_prerender_process(source, HTML_CACHE_DIR)
+
 
 # Create sidebar controls
 st.sidebar.header("Filter Controls")
 
-# Get all available chords for the dropdown
-all_chords = sorted(list(set([chord for chord in ["11", "A", "B", "C", "D", "E", "F", "G",
-                                                  "A7", "B7", "C7", "D7", "E7", "F7", "G7",
-                                                  "Am7", "Bm7", "Cm7", "Dm7", "Em7", "Fm7", "Gm7",
-                                                  "A9", "B9", "C9", "D9", "E9", "F9", "G9",
-                                                  "Adim", "Bdim", "Cdim", "Ddim", "Edim", "Fdim", "Gdim",
-                                                  "Bb7", "Eb7", "Ab7", "Db7", "Gb7", "Bbm7", "Ebm7",
-                                                  "Abm7", "Dbm7", "Gbm7", "Bb9", "Eb9", "Ab9", "Db9", "Gb9",
-                                                  "F#m7", "C#m7"]])))
-
+vocabulary = st.sidebar.radio(
+    "Chord vocabulary:",
+    list(VOCABULARIES),
+    help="The hand-written blues graph in E, or every root and chord quality generated from interval rules"
+)
+graph = load_chord_graph(vocabulary)
+if NETWORK_MODE == "static":
+    prerender_job = start_prerender(graph.version, VOCABULARIES[vocabulary])
+
+
+# Keep the focused chord when the key changes, moved to the new key
+def transpose_selection(base_graph, key_widget, old_key):
+    chord = move_to_key(base_graph, st.session_state.get("selected_chord"), old_key, st.session_state[key_widget])
+    if chord is not None:
+        st.session_state.selected_chord = chord
+
+
+# Hand-written graphs can be moved to any key; the generated graph has every
+# key already
+music_key = None
+if VOCABULARIES[vocabulary] != GENERATED:
+    home = KEYS[home_key(graph)]
+    key_widget = f"music_key:{vocabulary}"
+    music_key = st.sidebar.selectbox(
+        "Key:",
+        KEYS,
+        index=KEYS.index(home),
+        key=key_widget,
+        on_change=transpose_selection,
+        args=(graph, key_widget, st.session_state.get(key_widget, home)),
+        help=f"Transpose the whole graph, written in {home}, to another key"
+    )
+    graph = transposed_graph(graph, music_key)
+
+# Chords of the graph for the dropdowns, most central (by PageRank) first
+chord_index = get_chord_index(graph.version, graph)
+all_chords = chord_index.names
+
+
+# Clicking a chord in the network focuses it like picking it here
+def focus_clicked_chord(chord):
+    if chord in all_chords:
+        st.session_state.selected_chord = chord
+
+
+# Pressing Enter in the search box focuses the best match
+def focus_best_match(chord_index):
+    matches = chord_index.search(st.session_state.chord_search, limit=1)
+    if matches:
+        st.session_state.selected_chord = matches[0]
+
+
+chord_search = st.sidebar.text_input(
+    "Find a chord:",
+    key="chord_search",
+    placeholder="Gbm7, F#°, A minor...",
+    on_change=focus_best_match,
+    args=(chord_index,),
+    help="Narrows the list below; any spelling of the root or the chord quality works"
+)
+chord_options = chord_index.search(chord_search) if chord_search else all_chords
+# The focused chord stays pickable while the search hides it
+if st.session_state.get("selected_chord") in graph.index and st.session_state.selected_chord not in chord_options:
+    chord_options = [st.session_state.selected_chord] + chord_options
 
 selected_chord = st.sidebar.selectbox(
     "Select a chord to focus on:",
-    ["None"] + all_chords,
-    help="Choose a specific chord to see its relationships"
+    ["None"] + chord_options,
+    key="selected_chord",
+    help="Choose a specific chord to see its relationships, or click it in the network"
 )
 
+hops = st.sidebar.slider(
+    "Show chords within k transitions:",
+    min_value=1,
+    max_value=6,
+    value=1,
+    help="1 shows only the direct transitions of the selected chord"
+)
+
+# Large views group their chords into clusters while zoomed out
+CLUSTER_OPTIONS = {"Chord family": 'family', "Root": 'root', "Community": 'community'}
+cluster_by = st.sidebar.radio(
+    "Group chords when zoomed out by:",
+    list(CLUSTER_OPTIONS),
+    help="Zoom in or click a group to expand it"
+)
+network_style = dict(DEFAULT_STYLE, cluster_by=CLUSTER_OPTIONS[cluster_by])
+
+st.sidebar.subheader("Progression path")
+path_start = st.sidebar.selectbox("From:", ["None"] + all_chords)
+path_target = st.sidebar.selectbox("To:", ["None"] + all_chords)
+path_count = st.sidebar.number_input(
+    "Progressions to show:",
+    min_value=1,
+    max_value=10,
+    value=3,
+    help="The cheapest progression plus the next best alternatives"
+)
+
+paths = []
+if path_start in graph.index and path_target in graph.index:
+    planner = get_path_planner(graph.version, graph)
+    paths = planner.paths(path_start, path_target, int(path_count))
+
+st.sidebar.subheader("Generate a progression")
+generate_start = st.sidebar.selectbox("Start at:", all_chords)
+generate_length = st.sidebar.slider("Chords:", min_value=2, max_value=16, value=8)
+if st.sidebar.button("Generate", help="Walk the graph at random; natural transitions are likelier"):
+    progression = get_progression_sampler(graph.version, graph).sample(generate_start, generate_length)[0]
+    st.session_state.generated_progression = (graph.version, progression)
+
+# The last generated progression, if it belongs to the graph shown
+generated = st.session_state.get("generated_progression")
+generated = generated[1] if generated and generated[0] == graph.version else None
+
+with st.sidebar.expander("Most central chords"):
+    metrics = graph.metrics
+    top = [chord_id for chord_id in (-metrics['pagerank']).argsort(kind='stable')[:10]]
+    st.dataframe({
+        "Chord": [graph.names[chord_id] for chord_id in top],
+        "PageRank": [round(float(metrics['pagerank'][chord_id]), 4) for chord_id in top],
+        "In": [int(metrics['in_degree'][chord_id]) for chord_id in top],
+        "Out": [int(metrics['out_degree'][chord_id]) for chord_id in top],
+        "Betweenness": [round(float(metrics['betweenness'][chord_id]), 3) for chord_id in top],
+        "Group": [int(metrics['community'][chord_id]) + 1 for chord_id in top],
+    }, hide_index=True)
+
+st.sidebar.subheader("Corpus")
+corpus_file = st.sidebar.text_input(
+    "Corpus file:",
+    os.environ.get("CHORD_CORPUS", ""),
+    help="A local JSON Lines or CSV file with one song per line. "
+         "Transitions are drawn wider and more opaque the more often the corpus uses them."
+)
+corpus = None
+if corpus_file:
+    # A corpus that could not be counted is only counted again once it
+    # changes on disk, not on every rerun
+    corpus_failures = st.session_state.setdefault("corpus_failures", {})
+    try:
+        corpus_format(corpus_file)
+        attempt = (graph.version, corpus_key(corpus_file))
+        if attempt in corpus_failures:
+            st.sidebar.error(corpus_failures[attempt])
+        else:
+            with st.spinner("Counting transitions..."):
+                corpus = get_corpus_counts(graph.version, VOCABULARIES[vocabulary], music_key, corpus_file, attempt[1], graph)
+    except (OSError, ValueError) as e:
+        st.sidebar.error(str(e))
+    except subprocess.CalledProcessError as e:
+        corpus_failures[attempt] = f"Could not count {corpus_file}: {e.stderr.strip().splitlines()[-1] if e.stderr else e}"
+        st.sidebar.error(corpus_failures[attempt])
+if corpus is not None:
+    st.sidebar.caption(f"{corpus.progressions:,} songs, {corpus.transitions:,} transitions, "
+                       f"{corpus.coverage:.1%} of them in the graph")
+corpus_weights = corpus.edge_counts if corpus is not None else None
+
 #show_neighbors = st.sidebar.checkbox(
 #    "Show only direct transitions",
 #    value=False,
@@ -658,102 +330,36 @@ st.sidebar.markdown("""
 <span style='color:#FF5722;'>**Substitution**</span>: Substitution lets you use different chords while still keeping the same harmonic direction or feeling.
 """, unsafe_allow_html=True)
 
-Am7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\Am7.png")
-B7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\B7.png")
-C = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\C.png")
-C7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\C7.png")
-Cdim = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\Cdim.png")
-Cm7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\Cm7.png")
-F7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\F7.png")
-G7 = get_image_as_base64(r"C:\Users\rapha\repositories\streamlit_practical\images\G7.png")
-
+focus_chord = selected_chord if selected_chord != "None" else None
+path_list = [path for _, path in paths] + ([generated] if generated else [])
 
-# Verify the image by showing it in Streamlit (proof of loading)
+# Diagrams of exactly the chords in the filtered graph, cut from the sprite
+# atlas or generated from their fingering
+visible_chords = [graph.names[chord_id] for chord_id in sorted(visible_chord_ids(graph, focus_chord, hops, path_list))]
+atlas = get_sprite_atlas(graph.version, get_asset_manifest().version, graph)
+# Images the atlas cannot hold (SVGs) are linked at strip size instead
+diagrams = {**get_chord_diagrams(graph.version, graph),
+            **get_image_variants().urls([chord for chord in visible_chords if chord not in atlas], 'strip')}
 st.write("### Chords shown in the filtered Graph:")
-Am7 = f"data:image/png;base64,{Am7}"
-B7 = f"data:image/png;base64,{B7}"
-C = f"data:image/png;base64,{C}"
-C7 = f"data:image/png;base64,{C7}"
-Cdim = f"data:image/png;base64,{Cdim}"
-Cm7 = f"data:image/png;base64,{Cm7}"
-F7 = f"data:image/png;base64,{F7}"
-G7 = f"data:image/png;base64,{G7}"
-
-
-# Display images side by side using CSS flexbox
-st.markdown(f"""
-    <div style="display: flex; justify-content: space-around;">
-        <figure style="text-align: center;">
-            <img src='{Am7}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{C}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{C7}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{Cdim}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{Cm7}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{F7}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-        <figure style="text-align: center;">
-            <img src='{G7}' width='130' height='150'>
-            <figcaption></figcaption>
-        </figure>
-    </div>
-""", unsafe_allow_html=True)
-
-# Create and display network
-net = create_chord_network(
-    selected_chord if selected_chord != "None" else None#,
-   # show_neighbors
-)
-net.save_graph("chord_network.html")
-
-# Add custom JavaScript to the HTML file for hover image
-with open("chord_network.html", "a") as f:
-    custom_js = """
-    <script type="text/javascript">
-        var network = document.getElementById('mynetwork');
-        var hoverImage = document.createElement('img');
-        hoverImage.id = 'hoverImage';
-        hoverImage.src = 'data:image/png;base64,{img_base64}';
-        hoverImage.style.position = 'absolute';
-        hoverImage.style.display = 'none';
-        hoverImage.style.border = '1px solid black';
-        hoverImage.width = 100;
-        hoverImage.height = 100;
-        document.body.appendChild(hoverImage);
-
-        // Listen for hover event
-        network.addEventListener('mouseover', function(event) {
-            var nodeId = network.getNodeAt(event.pointer.DOM);
-            if (nodeId) {
-                hoverImage.style.display = 'block';
-                hoverImage.style.left = event.pageX + 'px';
-                hoverImage.style.top = event.pageY + 'px';
-            } else {
-                hoverImage.style.display = 'none';
-            }
-        });
-
-        network.addEventListener('mouseout', function(event) {
-            hoverImage.style.display = 'none';
-        });
-    </script>
-    """
-    f.write(custom_js)
+if any(chord in atlas or chord in diagrams for chord in visible_chords):
+    st.markdown(atlas.strip_html(visible_chords, diagrams), unsafe_allow_html=True)
+else:
+    st.caption("No chord diagrams for the chords shown.")
+
+hover_diagrams = get_hover_diagrams(graph.version, get_asset_manifest().version, graph)
+
+if NETWORK_MODE == "static":
+    # Create the network page, or reuse it if this exact view was rendered before
+    html = get_render_cache().get_or_render(
+        view_key(graph, focus_chord, hops, path_list, network_style, hover_diagrams, corpus_weights),
+        lambda: render_network_html(graph, focus_chord, hops, path_list, network_style, hover_diagrams, corpus_weights)
+    )
+
+    with st.sidebar.expander("Render cache"):
+        stats = get_render_cache().stats()
+        st.write(f"{stats['hits']} hits, {stats['misses']} misses, {stats['disk_hits']} from disk, {stats['evictions']} evictions")
+        st.write(f"{stats['entries']} pages, {stats['bytes'] / 1024:.0f} KB of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        st.write("Prerendering chord views..." if prerender_job.poll() is None else "All chord views prerendered")
 
 # Add legend with more detailed explanations
 #st.write("### Chord Types Legend")
@@ -770,9 +376,61 @@ with col4:
 with col5:
     st.markdown("🔵 **Dominant 9th**: Needs Resolving")
 
-# Save and display the network
-net.save_graph("chord_network.html")
-st.components.v1.html(open("chord_network.html", "r").read(), height=600)
+# Display the network
+if NETWORK_MODE == "static":
+    st.components.v1.html(html, height=600)
+else:
+    chord_network(graph, focus_chord, hops, path_list, network_style, on_select=focus_clicked_chord,
+                  diagrams=hover_diagrams, weights=corpus_weights)
+
+# List the highlighted progressions under the graph
+if path_start in graph.index and path_target in graph.index:
+    st.write(f"### Progressions from {path_start} to {path_target}")
+    if not paths:
+        st.write("No progression leads from one chord to the other.")
+    for rank, (cost, path) in enumerate(paths, start=1):
+        st.markdown(f"{rank}. {' → '.join(path)} (cost {cost:g})")
+if generated:
+    st.write("### Generated progression")
+    st.markdown(' → '.join(generated))
+
+# Check progressions against the graph: one pasted progression transition by
+# transition, or a file of progressions (one per line) summarised
+with st.expander("Check progressions"):
+    validator = get_progression_validator(graph.version, graph)
+    pasted = st.text_input("Progression:", placeholder="E7 A7 E7 B7 A7 E7")
+    if pasted:
+        for source, target, relation in validator.check(pasted):
+            st.markdown(f"{source} → {target}: {relation or '*not in the graph*'}")
+
+    uploaded = st.file_uploader("Or a file with one progression per line:", type=["txt", "csv"])
+    if uploaded is not None:
+        # Keep the report of the last upload so reruns do not read it again
+        report_key = (graph.version, uploaded.file_id)
+        report = st.session_state.get("progression_report")
+        if report is None or report[0] != report_key:
+            uploaded.seek(0)
+            report = (report_key, validator.validate_file(uploaded, csv_rows=uploaded.name.lower().endswith(".csv")))
+            st.session_state.progression_report = report
+        report = report[1]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Progressions", f"{report.progressions:,}")
+        col2.metric("Transitions", f"{report.transitions:,}")
+        col3.metric("In the graph", f"{report.coverage:.1%}")
+        if report.unknown_chords:
+            st.write("Unknown chords: " + ", ".join(f"{chord} ({count:,})"
+                                                    for chord, count in report.unknown_chords.most_common(20)))
+        if report.missing_transitions:
+            st.write("Most common transitions not in the graph: " + ", ".join(
+                f"{source} → {target} ({count:,})" for (source, target), count in report.missing_transitions.most_common(10)))
+        top_transitions = report.top_transitions(10)
+        if top_transitions:
+            st.dataframe({
+                "From": [source for source, _, _, _ in top_transitions],
+                "To": [target for _, target, _, _ in top_transitions],
+                "Relation": [relation for _, _, relation, _ in top_transitions],
+                "Count": [count for _, _, _, count in top_transitions],
+            }, hide_index=True)
 
 # Clean up
 #if os.path.exists("chord_network.html"):
@@ -0,0 +1,29 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+# Open `path` for writing through a temporary file next to it that replaces
+# it once writing succeeded, so other processes never read a partial file.
+# The parent directory is created if needed.
+@contextmanager
+def atomic_open(path, mode='wb', **kwargs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Write bytes or text to `path` atomically
+def write_atomic(path, data):
+    if isinstance(data, str):
+        with atomic_open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+    else:
+        with atomic_open(path, 'wb') as f:
+            f.write(data)
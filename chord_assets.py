@@ -0,0 +1,173 @@
+import hashlib
+import os
+import re
+import threading
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Watching is optional; without it the directory is polled
+    Observer = None
+
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+IMAGE_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+}
+
+# Chord quality as written in file names -> suffix used by the chord graphs.
+# Exact spellings are tried first so that M7 and m7 stay apart; whole words
+# are also matched case-insensitively.
+QUALITY_ALIASES = {
+    '': '', 'M': '', 'maj': '', 'major': '',
+    'm': 'm', 'min': 'm', 'minor': 'm', '-': 'm',
+    '7': '7', 'dom7': '7', 'dominant7': '7',
+    'M7': 'maj7', 'maj7': 'maj7', 'major7': 'maj7',
+    'm7': 'm7', 'min7': 'm7', 'minor7': 'm7', '-7': 'm7',
+    '6': '6', '9': '9',
+    'dim': 'dim', 'diminished': 'dim', '°': 'dim', 'o': 'dim',
+    'aug': 'aug', 'augmented': 'aug', '+': 'aug',
+}
+QUALITY_WORDS = {alias.lower(): quality for alias, quality in QUALITY_ALIASES.items() if len(alias) > 2}
+
+NOTE_NUMBERS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+_CHORD_NAME = re.compile(r"^\s*([A-Ga-g])\s*([#♯b♭]?)\s*(.*?)\s*$")
+
+
+# Canonical chord ID (C, F#dim, Bbm7, ...) of a file or chord name, or None
+# if the name is not a chord
+def canonical_chord_id(name):
+    match = _CHORD_NAME.match(name)
+    if not match:
+        return None
+    root, accidental, quality = match.groups()
+    accidental = {'♯': '#', '♭': 'b'}.get(accidental, accidental)
+    quality = quality.replace(" ", "")
+    if quality in QUALITY_ALIASES:
+        quality = QUALITY_ALIASES[quality]
+    elif quality.lower() in QUALITY_WORDS:
+        quality = QUALITY_WORDS[quality.lower()]
+    else:
+        return None
+    return root.upper() + accidental + quality
+
+
+# (root pitch class, quality suffix) of a chord name such as F#m7 or
+# 'Bb Major', or None if the name is not a chord. Enharmonic names such as
+# F#m7 and Gbm7 give the same pair.
+def parse_chord(name):
+    chord = canonical_chord_id(name)
+    if chord is None:
+        return None
+    accidental = chord[1:2] if chord[1:2] in ('#', 'b') else ''
+    root = (NOTE_NUMBERS[chord[0]] + {'#': 1, 'b': -1, '': 0}[accidental]) % 12
+    return root, chord[1 + len(accidental):]
+
+
+# Index of the chord images in one directory, by chord: root pitch class
+# and quality (parse_chord), so 'Gbm7.png' is the image of F#m7 and
+# 'F Major.png' the image of FMajor. Lookups take any chord name.
+#
+# The directory is scanned once and rescanned only after it changes: a
+# watchdog observer marks the index dirty when one is available, otherwise
+# the directory's mtime is checked on access. File contents are read once
+# and kept with their hash, keyed by path, mtime and size, so an edited file
+# is read again. In steady state, lookups do no image I/O.
+class AssetManifest:
+
+    def __init__(self, image_dir=IMAGE_DIR, watch=True):
+        self.image_dir = image_dir
+        self._version = None
+        self._entries = {}
+        self._contents = {}
+        self._dir_mtime = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._observer = None
+        if watch and Observer is not None:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.schedule(_DirtyHandler(self), image_dir)
+            self._observer.start()
+
+    def __contains__(self, chord):
+        return parse_chord(chord) in self.entries()
+
+    # Changes whenever an image is added, removed or edited
+    @property
+    def version(self):
+        self.entries()
+        return self._version
+
+    # {(root, quality): (absolute path, mtime_ns, size)}, rescanned if the
+    # directory changed
+    def entries(self):
+        with self._lock:
+            if self._observer is None:
+                mtime = os.stat(self.image_dir).st_mtime_ns
+                if mtime != self._dir_mtime:
+                    self._dir_mtime = mtime
+                    self._dirty = True
+            if self._dirty:
+                self._scan()
+            return self._entries
+
+    def read(self, chord):
+        return self._content(chord)[1]
+
+    # Hash of the image content, usable as a cache key without reading it
+    def digest(self, chord):
+        return self._content(chord)[0]
+
+    def mime_type(self, chord):
+        return IMAGE_TYPES[os.path.splitext(self.entries()[parse_chord(chord)][0])[1].lower()]
+
+    def _content(self, chord):
+        path, mtime, size = self.entries()[parse_chord(chord)]
+        key = (path, mtime, size)
+        with self._lock:
+            content = self._contents.get(key)
+            if content is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                content = (hashlib.sha1(data).hexdigest(), data)
+                self._contents[key] = content
+            return content
+
+    def _scan(self):
+        entries = {}
+        for name in sorted(os.listdir(self.image_dir)):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() not in IMAGE_TYPES:
+                continue
+            chord = parse_chord(stem)
+            if chord is None or chord in entries:
+                continue
+            path = os.path.join(self.image_dir, name)
+            stat = os.stat(path)
+            entries[chord] = (path, stat.st_mtime_ns, stat.st_size)
+
+        # Drop the contents of files that changed or went away
+        live = set(entries.values())
+        self._contents = {key: content for key, content in self._contents.items() if key in live}
+        self._entries = entries
+        self._version = hashlib.sha1(repr(sorted(entries.items())).encode('utf-8')).hexdigest()[:16]
+        self._dirty = False
+
+
+if Observer is not None:
+    class _DirtyHandler(FileSystemEventHandler):
+
+        def __init__(self, manifest):
+            self.manifest = manifest
+
+        def on_any_event(self, event):
+            # Reading the images ourselves must not invalidate the index
+            if event.event_type not in ("opened", "closed_no_write"):
+                self.manifest._dirty = True
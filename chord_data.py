@@ -0,0 +1,264 @@
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+import numpy as np
+
+from atomic_file import atomic_open
+from chord_graph import ChordGraph
+from chord_theory import generate_chord_graph
+
+try:
+    import yaml
+except ImportError:  # YAML support is optional
+    yaml = None
+
+
+# Bump when the artifact layout changes so old cache files are ignored
+FORMAT_VERSION = 1
+MAGIC = b"CHGR"
+HEADER = struct.Struct("<4sII")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chord_cache")
+
+# Graph source naming the rule-generated 12-key graph instead of a data file
+GENERATED = "generated"
+
+HEX_COLOR = re.compile(r"^#[0-9A-Fa-f]{3}([0-9A-Fa-f]{3})?$")
+
+
+class ChordDataError(ValueError):
+    pass
+
+
+# Raise on repeated keys instead of silently keeping the last one
+def _unique_pairs(pairs):
+    result = {}
+    for key, value in pairs:
+        if key in result:
+            raise ChordDataError(f"duplicate key {key!r}")
+        result[key] = value
+    return result
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_pairs_hook=_unique_pairs)
+
+
+def _read_yaml(path):
+    if yaml is None:
+        raise ChordDataError(f"{path}: reading YAML files requires PyYAML")
+
+    class UniqueKeyLoader(yaml.SafeLoader):
+        pass
+
+    def construct_mapping(loader, node, deep=False):
+        return _unique_pairs(
+            (loader.construct_object(key, deep=deep), loader.construct_object(value, deep=deep))
+            for key, value in node.value)
+
+    UniqueKeyLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, construct_mapping)
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return yaml.load(f, Loader=UniqueKeyLoader)
+        except yaml.YAMLError as e:
+            mark = getattr(e, "problem_mark", None)
+            where = f"line {mark.line + 1}: " if mark is not None else ""
+            raise ChordDataError(f"{where}{getattr(e, 'problem', None) or e}") from None
+
+
+# CSV files have one row per transition: chord,type,color,target,relation.
+# A chord without transitions is a row with empty target and relation.
+def _read_csv(path):
+    chords = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            chord = (row.get("chord") or "").strip()
+            entry = chords.setdefault(chord, {"type": row.get("type"), "color": row.get("color"), "related": {}})
+            if (entry["type"], entry["color"]) != (row.get("type"), row.get("color")):
+                raise ChordDataError(f"line {line}: conflicting type/color for {chord!r}")
+            target = (row.get("target") or "").strip()
+            if target:
+                if target in entry["related"]:
+                    raise ChordDataError(f"line {line}: duplicate transition {chord!r} -> {target!r}")
+                entry["related"][target] = row.get("relation")
+    return chords
+
+
+READERS = {
+    ".json": _read_json,
+    ".yaml": _read_yaml,
+    ".yml": _read_yaml,
+    ".csv": _read_csv,
+}
+
+
+# Check the structure of a progression dict and that every transition points
+# at a chord defined in the same file. All problems are reported together.
+def validate_progression(chords, source="<progression>"):
+    errors = []
+    if not isinstance(chords, dict) or not chords:
+        raise ChordDataError(f"{source}: expected a non-empty mapping of chords")
+
+    for chord, data in chords.items():
+        if not isinstance(chord, str) or not chord.strip():
+            errors.append(f"invalid chord name {chord!r}")
+            continue
+        if not isinstance(data, dict):
+            errors.append(f"{chord}: expected a mapping with 'type', 'color' and 'related'")
+            continue
+        if not isinstance(data.get("type"), str) or not data["type"]:
+            errors.append(f"{chord}: missing 'type'")
+        if not isinstance(data.get("color"), str) or not HEX_COLOR.match(data["color"]):
+            errors.append(f"{chord}: 'color' must be a hex color, got {data.get('color')!r}")
+        related = data.get("related", {})
+        if not isinstance(related, dict):
+            errors.append(f"{chord}: 'related' must be a mapping of chord -> relation")
+            continue
+        for target, relation in related.items():
+            if not isinstance(relation, str) or not relation.strip():
+                errors.append(f"{chord} -> {target}: missing relation description")
+            elif HEX_COLOR.match(relation):
+                errors.append(f"{chord}: {target!r} looks like a style option ({relation}), not a transition")
+            elif target not in chords:
+                errors.append(f"{chord} -> {target}: target chord is not defined")
+
+    if errors:
+        raise ChordDataError(f"{source}: " + "; ".join(errors))
+    return chords
+
+
+def load_progression(path):
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ChordDataError(f"{path}: unsupported file type (use {', '.join(sorted(READERS))})")
+    try:
+        chords = reader(path)
+    except ChordDataError as e:
+        raise ChordDataError(f"{path}: {e}") from None
+    except (ValueError, csv.Error) as e:
+        raise ChordDataError(f"{path}: {e}") from e
+    return validate_progression(chords, path)
+
+
+# Compiled artifacts are a small JSON header followed by the int32 CSR arrays,
+# so loading one is an mmap plus a few zero-copy np.frombuffer views.
+def write_artifact(graph, path):
+    arrays = [graph.indptr, graph.indices, graph.edge_labels]
+    header = json.dumps({
+        "version": graph.version,
+        "names": graph.names,
+        "types": graph.types,
+        "colors": graph.colors,
+        "labels": graph.labels,
+        "lengths": [len(a) for a in arrays],
+    }).encode("utf-8")
+    header += b" " * (-(HEADER.size + len(header)) % 8)
+
+    with atomic_open(path) as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for array in arrays:
+            f.write(np.ascontiguousarray(array, dtype="<i4").tobytes())
+
+
+def read_artifact(path):
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, header_size = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ChordDataError(f"{path}: not a compiled chord graph (format {version})")
+    header = json.loads(bytes(buffer[HEADER.size:HEADER.size + header_size]))
+
+    offset = HEADER.size + header_size
+    arrays = []
+    for length in header["lengths"]:
+        arrays.append(np.frombuffer(buffer, dtype="<i4", count=length, offset=offset))
+        offset += 4 * length
+    indptr, indices, edge_labels = arrays
+    return ChordGraph(header["names"], header["types"], header["colors"],
+                      indptr, indices, edge_labels, header["labels"], version=header["version"])
+
+
+def content_hash(path):
+    digest = hashlib.sha256(f"chord-graph-v{FORMAT_VERSION}:".encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# Load a progression file through the artifact cache. The artifact name is the
+# hash of the file contents, so an edited file never reuses a stale compile,
+# prefixed by a hash of the file's absolute path, so files that share a name
+# keep apart artifacts.
+def compile_progression(path, cache_dir=DEFAULT_CACHE_DIR):
+    digest = content_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    source = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    prefix = f"{stem}-{source}-"
+    artifact = os.path.join(cache_dir, f"{prefix}{digest}.cgraph")
+    if os.path.exists(artifact):
+        try:
+            return read_artifact(artifact)
+        except (ChordDataError, OSError, ValueError, struct.error):
+            pass  # corrupt or outdated, compile again
+
+    graph = ChordGraph.from_dict(load_progression(path), version=digest)
+    os.makedirs(cache_dir, exist_ok=True)
+    write_artifact(graph, artifact)
+
+    # Drop the artifacts of earlier versions of the same file
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(".cgraph") and name != os.path.basename(artifact):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    return graph
+
+
+# The graph of a source: a progression file, or GENERATED
+def load_graph(source):
+    if source == GENERATED:
+        return generate_chord_graph()
+    return compile_progression(source)
+
+
+# Process-wide set of compiled progression files. get() stats the file on each
+# call (cheap enough to do on every rerun) and recompiles only the files whose
+# size or modification time changed since they were last loaded.
+class ProgressionLibrary:
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._graphs = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._graphs.get(path)
+            if cached is None or cached[0] != key:
+                cached = (key, compile_progression(path, self.cache_dir))
+                self._graphs[path] = cached
+            return cached[1]
+
+    # Like get(), but returns (graph, error): when the file no longer compiles
+    # or cannot be read (say, while an editor replaces it), the graph it last
+    # compiled to (None if it never did) and the ChordDataError or OSError, so
+    # an app can report a bad edit and keep running
+    def get_last_good(self, path):
+        try:
+            return self.get(path), None
+        except (ChordDataError, OSError) as e:
+            with self._lock:
+                cached = self._graphs.get(os.path.abspath(path))
+            return (cached[1] if cached else None), e
@@ -0,0 +1,193 @@
+import hashlib
+import html
+import itertools
+import json
+import os
+from functools import lru_cache
+
+from atomic_file import write_atomic
+from chord_assets import parse_chord
+from image_variants import static_url
+from network_render import STATIC_DIR
+
+
+# Generated diagrams are written here, so Streamlit serves them as static files
+DIAGRAM_DIR = os.path.join(STATIC_DIR, "diagrams")
+
+# Standard guitar tuning as pitch classes, low E string first
+TUNING = [4, 9, 2, 7, 11, 4]
+
+# Chord tones of each quality in semitones above the root. The fifth (7) may
+# be left out of chords with four or more tones, as guitarists usually do.
+CHORD_TONES = {
+    '':     (0, 4, 7),
+    'm':    (0, 3, 7),
+    '7':    (0, 4, 7, 10),
+    'maj7': (0, 4, 7, 11),
+    'm7':   (0, 3, 7, 10),
+    '6':    (0, 4, 7, 9),
+    '9':    (0, 4, 7, 10, 2),
+    'dim':  (0, 3, 6),
+    'aug':  (0, 4, 8),
+}
+
+# Frets a hand covers without stretching, and the highest fret a shape starts on
+FRET_SPAN = 4
+HIGHEST_POSITION = 9
+MIN_STRINGS = 4
+MAX_FINGERS = 4
+
+# Diagram geometry, in the units of the SVG's 130x150 view box
+STRING_GAP = 16
+FRET_GAP = 22
+GRID_LEFT = 25
+GRID_TOP = 44
+
+
+# Pitch class of the root and the chord tones of a chord name, or None if the
+# name is not a chord with a known quality
+def chord_tones(chord):
+    parsed = parse_chord(chord)
+    if parsed is None or parsed[1] not in CHORD_TONES:
+        return None
+    return parsed[0], CHORD_TONES[parsed[1]]
+
+
+# The easiest voicing of a chord in standard tuning: one fret per string, low
+# E first, None for a muted string and 0 for an open one. The sounding
+# strings are adjacent, the lowest one plays the root, every chord tone but
+# an optional fifth is heard and the shape needs at most four fingers (a
+# barre counts as one). Among those, shapes with a small stretch, more
+# strings, fewer fingers and a low position win. Returns None if no shape fits.
+@lru_cache(maxsize=None)
+def chord_fingering(chord):
+    tones = chord_tones(chord)
+    if tones is None:
+        return None
+    root, intervals = tones
+    wanted = {(root + interval) % 12 for interval in intervals}
+    required = {(root + interval) % 12 for interval in intervals
+                if not (interval == 7 and len(intervals) > 3)}
+
+    best, best_cost = None, None
+    for low in range(1, HIGHEST_POSITION + 1):
+        # Open strings only go with shapes in the first position
+        frets = ([0] if low == 1 else []) + list(range(low, low + FRET_SPAN))
+        choices = [[fret for fret in frets if (pitch + fret) % 12 in wanted] for pitch in TUNING]
+        for bass in range(len(TUNING) - MIN_STRINGS + 1):
+            bass_frets = [fret for fret in choices[bass] if (TUNING[bass] + fret) % 12 == root]
+            for top in range(bass + MIN_STRINGS - 1, len(TUNING)):
+                for shape in itertools.product(bass_frets, *choices[bass + 1:top + 1]):
+                    if not required <= {(TUNING[bass + i] + fret) % 12 for i, fret in enumerate(shape)}:
+                        continue
+                    fingers = _finger_count(shape)
+                    if fingers > MAX_FINGERS:
+                        continue
+                    fretted = [fret for fret in shape if fret] or [0]
+                    cost = 2 * (max(fretted) - min(fretted)) + fingers - 2 * len(shape) + min(fretted) / 2
+                    if best_cost is None or cost < best_cost:
+                        best_cost = cost
+                        best = tuple([None] * bass + list(shape) + [None] * (len(TUNING) - top - 1))
+    return best
+
+
+# Fingers needed for a shape, counting a barre as one
+def _finger_count(shape):
+    fretted = [fret for fret in shape if fret]
+    barre = _barre(shape)
+    if barre is None:
+        return len(fretted)
+    return 1 + sum(fret > barre[0] for fret in fretted)
+
+
+# (fret, first string, last string) of the barre a shape can use, or None.
+# Two or more strings at the lowest fretted fret are held by one finger if no
+# open or muted string lies between them.
+def _barre(shape):
+    fretted = [fret for fret in shape if fret]
+    if len(fretted) < 2:
+        return None
+    lowest = min(fretted)
+    held = [i for i, fret in enumerate(shape) if fret == lowest]
+    if len(held) > 1 and all(shape[i] for i in range(held[0], held[-1] + 1)):
+        return lowest, held[0], held[-1]
+    return None
+
+
+# A compact SVG chord box of the chord's fingering, or None if there is none.
+# Coordinates are whole numbers and the grid is a single path, so a diagram
+# is well under a kilobyte.
+@lru_cache(maxsize=None)
+def chord_svg(chord):
+    fingering = chord_fingering(chord)
+    if fingering is None:
+        return None
+    fretted = [fret for fret in fingering if fret]
+    first = 1 if not fretted or max(fretted) <= FRET_SPAN else min(fretted)
+    right = GRID_LEFT + STRING_GAP * (len(TUNING) - 1)
+    bottom = GRID_TOP + FRET_GAP * FRET_SPAN
+
+    grid = "".join(f"M{GRID_LEFT} {GRID_TOP + FRET_GAP * i}H{right}" for i in range(FRET_SPAN + 1))
+    grid += "".join(f"M{GRID_LEFT + STRING_GAP * i} {GRID_TOP}V{bottom}" for i in range(len(TUNING)))
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 130 150" width="130" height="150" '
+        'font-family="sans-serif" text-anchor="middle">',
+        '<rect width="130" height="150" rx="6" fill="#fff"/>',
+        f'<text x="65" y="20" font-size="16" font-weight="bold">{html.escape(chord)}</text>',
+        f'<path d="{grid}" stroke="#333" fill="none"/>',
+    ]
+    if first == 1:
+        parts.append(f'<path d="M{GRID_LEFT} {GRID_TOP}H{right}" stroke="#333" stroke-width="4"/>')
+    else:
+        parts.append(f'<text x="{GRID_LEFT - 14}" y="{GRID_TOP + FRET_GAP // 2 + 4}" font-size="11">{first}</text>')
+
+    barre = _barre(fingering)
+    if barre is not None:
+        fret, low_string, high_string = barre
+        y = GRID_TOP + FRET_GAP * (fret - first) + FRET_GAP // 2
+        parts.append(f'<path d="M{GRID_LEFT + STRING_GAP * low_string} {y}H{GRID_LEFT + STRING_GAP * high_string}" '
+                     f'stroke="#333" stroke-width="12" stroke-linecap="round"/>')
+
+    for i, fret in enumerate(fingering):
+        x = GRID_LEFT + STRING_GAP * i
+        if fret is None:
+            parts.append(f'<text x="{x}" y="{GRID_TOP - 6}" font-size="12">×</text>')
+        elif fret == 0:
+            parts.append(f'<circle cx="{x}" cy="{GRID_TOP - 10}" r="4" stroke="#333" fill="none"/>')
+        else:
+            parts.append(f'<circle cx="{x}" cy="{GRID_TOP + FRET_GAP * (fret - first) + FRET_GAP // 2}" r="6" fill="#333"/>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+# Write the diagrams of the given chords under diagram_dir and return
+# {chord: static URL}. Files are named after a hash of their content, so each
+# one is written once and browsers can keep it until the drawing changes.
+# Chords without a fingering are left out.
+def build_chord_diagrams(chords, diagram_dir=DIAGRAM_DIR):
+    urls = {}
+    for chord in sorted(set(chords)):
+        svg = chord_svg(chord)
+        if svg is None:
+            continue
+        data = svg.encode('utf-8')
+        path = os.path.join(diagram_dir, f"{chord.replace('#', 'sharp')}-{hashlib.sha1(data).hexdigest()[:12]}.svg")
+        if not os.path.exists(path):
+            write_atomic(path, data)
+        urls[chord] = static_url(path)
+    return urls
+
+
+# Write the {chord: URL} map of the diagrams shown when hovering the given
+# chords to a static JSON file and return its URL. Chords with an image get
+# its hover-size variant, the others their generated SVG. Pages only carry
+# the map's URL, which changes whenever a diagram does.
+def hover_diagram_map(chords, variants, diagram_dir=DIAGRAM_DIR):
+    urls = build_chord_diagrams(chords, diagram_dir)
+    urls.update(variants.urls(chords, 'hover'))
+    data = json.dumps(urls, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    path = os.path.join(diagram_dir, f"hover-{hashlib.sha1(data).hexdigest()[:12]}.json")
+    if not os.path.exists(path):
+        write_atomic(path, data)
+    return static_url(path)
+
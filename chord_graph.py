@@ -0,0 +1,159 @@
+import hashlib
+import json
+
+import numpy as np
+from scipy import sparse
+
+from graph_layout import force_layout
+from graph_metrics import graph_metrics
+
+
+# Hop distance stored for chords that cannot be reached from each other
+UNREACHABLE = 255
+
+# Number of BFS sources expanded together when computing hop distances
+BFS_BLOCK_SIZE = 512
+
+
+# Compiled, read-only view of a chord progression dict.
+#
+# Chord names are interned to integer ids (in dict order) and the 'related'
+# transitions are stored as CSR arrays: the successors of chord i are
+# indices[indptr[i]:indptr[i + 1]], so a lookup only touches the edges of
+# that one chord instead of scanning the whole dict.
+class ChordGraph:
+
+    def __init__(self, names, types, colors, indptr, indices, edge_labels, labels, version=None):
+        self.names = list(names)
+        self.types = list(types)
+        self.colors = list(colors)
+        self.labels = list(labels)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.edge_labels = np.asarray(edge_labels, dtype=np.int32)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.version = version or self._content_hash()
+
+        self.tooltips = [self._build_tooltip(i) for i in range(len(self.names))]
+        self._hop_distances = None
+        self._layout = None
+        self._metrics = None
+
+    # Build a graph from the {'chord': {'type', 'color', 'related': {...}}} dicts
+    # used by the apps. Transitions to chords that are not defined are dropped.
+    @classmethod
+    def from_dict(cls, chords, version=None):
+        names = list(chords.keys())
+        index = {name: i for i, name in enumerate(names)}
+        labels = []
+        label_ids = {}
+        indptr = [0]
+        indices = []
+        edge_labels = []
+        for data in chords.values():
+            for related, relation in data.get('related', {}).items():
+                if related not in index:
+                    continue
+                if relation not in label_ids:
+                    label_ids[relation] = len(labels)
+                    labels.append(relation)
+                indices.append(index[related])
+                edge_labels.append(label_ids[relation])
+            indptr.append(len(indices))
+
+        return cls(names,
+                   [data['type'] for data in chords.values()],
+                   [data['color'] for data in chords.values()],
+                   indptr, indices, edge_labels, labels, version=version)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    # All-pairs number of transitions between chords, following transitions in
+    # either direction. Computed once per graph with a
+    # BFS that expands a block of sources per sparse matrix product, and kept
+    # as an n x n uint8 matrix (UNREACHABLE for disconnected chords).
+    @property
+    def hop_distances(self):
+        if self._hop_distances is None:
+            self._hop_distances = self._compute_hop_distances()
+        return self._hop_distances
+
+    # Force-directed coordinates of every chord, as an n x 2 float32 array
+    # scaled to an average transition length of 1. Computed once per graph;
+    # filtered views show slices of it, so chords keep their place whatever
+    # is selected.
+    @property
+    def layout(self):
+        if self._layout is None:
+            sources = np.repeat(np.arange(len(self.names)), np.diff(self.indptr))
+            self._layout = force_layout(len(self.names), sources, self.indices, edge_length=1)
+        return self._layout
+
+    # PageRank, degrees, betweenness and community of every chord (see
+    # graph_metrics), computed once per graph
+    @property
+    def metrics(self):
+        if self._metrics is None:
+            self._metrics = graph_metrics(self)
+        return self._metrics
+
+    # Ids of the chords at most `hops` transitions away from the chord
+    def within_hops(self, chord, hops):
+        return np.flatnonzero(self.hop_distances[self.index[chord]] <= hops)
+
+    def _compute_hop_distances(self):
+        n = len(self.names)
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(self.indices), dtype=np.float32), self.indices, self.indptr), shape=(n, n))
+        adjacency = ((adjacency + adjacency.T) > 0).astype(np.float32).tocsr()
+
+        # Work on columns: column b of `frontier` marks the chords first reached
+        # from source start + b at the current hop
+        distances = np.full((n, n), UNREACHABLE, dtype=np.uint8)
+        for start in range(0, n, BFS_BLOCK_SIZE):
+            sources = np.arange(start, min(start + BFS_BLOCK_SIZE, n))
+            columns = np.arange(len(sources))
+            visited = np.zeros((n, len(sources)), dtype=bool)
+            visited[sources, columns] = True
+            frontier = visited.astype(np.float32)
+            block = distances[start:start + len(sources)].T
+            block[sources, columns] = 0
+            for hop in range(1, UNREACHABLE):
+                reached = (adjacency @ frontier) > 0
+                reached &= ~visited
+                if not reached.any():
+                    break
+                block[reached] = hop
+                visited |= reached
+                frontier = reached.astype(np.float32)
+        return distances
+
+    # (edge id, source id, target id) for every edge between the given chords
+    def edges_within(self, chord_ids):
+        chord_ids = set(chord_ids)
+        for source in sorted(chord_ids):
+            for edge in range(self.indptr[source], self.indptr[source + 1]):
+                target = int(self.indices[edge])
+                if target in chord_ids:
+                    yield edge, source, target
+
+    def edge_label(self, edge):
+        return self.labels[self.edge_labels[edge]]
+
+    def _build_tooltip(self, chord_id):
+        lines = [f"{self.names[chord_id]} ({self.types[chord_id]})", "", "Related chords:"]
+        for edge in range(self.indptr[chord_id], self.indptr[chord_id + 1]):
+            lines.append(f"→ {self.names[self.indices[edge]]}: {self.edge_label(edge)}")
+        return "\n".join(lines) + "\n"
+
+    def _content_hash(self):
+        digest = hashlib.sha1()
+        digest.update(json.dumps([self.names, self.types, self.colors, self.labels]).encode('utf-8'))
+        for array in (self.indptr, self.indices, self.edge_labels):
+            digest.update(array.tobytes())
+        return digest.hexdigest()[:16]
@@ -0,0 +1,141 @@
+import heapq
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+
+
+# Cost of following a transition, by the first keyword found in its relation.
+# Resolutions and plain progressions are the "natural" moves, colour and
+# tension moves cost more so the planner prefers functional harmony.
+RELATION_WEIGHTS = [
+    ('resolution', 1.0),
+    ('progression', 1.0),
+    ('dominant', 1.5),
+    ('relative', 1.5),
+    ('substitution', 2.0),
+    ('exten', 2.0),
+    ('tension', 2.5),
+    ('diminished', 2.5),
+]
+DEFAULT_WEIGHT = 2.0
+
+
+def relation_weight(relation):
+    relation = relation.lower()
+    for keyword, weight in RELATION_WEIGHTS:
+        if keyword in relation:
+            return weight
+    return DEFAULT_WEIGHT
+
+
+# Shortest and k-shortest progressions between two chords of a ChordGraph.
+#
+# For each target the exact cost-to-target of every chord is computed once
+# with scipy's Dijkstra on the reversed graph. That gives the shortest path
+# directly and is a consistent A* heuristic for the spur searches of Yen's
+# algorithm, which only ever remove edges. Results are memoized per
+# (source, target, k).
+class PathPlanner:
+
+    def __init__(self, graph, cache_size=1024):
+        self.graph = graph
+        label_weights = np.array([relation_weight(label) for label in graph.labels] or [DEFAULT_WEIGHT])
+        self.weights = label_weights[graph.edge_labels]
+
+        n = len(graph)
+        self._reverse = sparse.csr_matrix((self.weights, graph.indices, graph.indptr), shape=(n, n)).T.tocsr()
+        self._indptr = graph.indptr.tolist()
+        self._indices = graph.indices.tolist()
+        self._edge_weights = self.weights.tolist()
+        self._cost_to = lru_cache(maxsize=64)(self._compute_cost_to)
+        self._search = lru_cache(maxsize=cache_size)(self._k_shortest)
+
+    # Up to k progressions from source to target, cheapest first, as
+    # (cost, [chord names]) pairs
+    def paths(self, source, target, k=1):
+        found = self._search(self.graph.index[source], self.graph.index[target], k)
+        return [(cost, [self.graph.names[i] for i in nodes]) for cost, nodes in found]
+
+    def _compute_cost_to(self, target):
+        return dijkstra(self._reverse, indices=target).tolist()
+
+    # Walk from source to target along edges that keep the cost-to-target tight
+    def _follow_shortest(self, source, target, cost_to):
+        nodes = [source]
+        while nodes[-1] != target:
+            node = nodes[-1]
+            for edge in range(self._indptr[node], self._indptr[node + 1]):
+                neighbour = self._indices[edge]
+                if abs(self._edge_weights[edge] + cost_to[neighbour] - cost_to[node]) < 1e-9:
+                    nodes.append(neighbour)
+                    break
+        return nodes
+
+    # A* from source to target avoiding the banned chords and (u, v) edges.
+    # Paths costing more than `limit` are not explored.
+    def _spur_search(self, source, target, cost_to, banned_nodes, banned_edges, limit=np.inf):
+        best = {source: 0.0}
+        previous = {}
+        queue = [(cost_to[source], 0.0, source)]
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if node == target:
+                nodes = [node]
+                while nodes[-1] != source:
+                    nodes.append(previous[nodes[-1]])
+                return cost, nodes[::-1]
+            if cost > best[node]:
+                continue
+            for edge in range(self._indptr[node], self._indptr[node + 1]):
+                neighbour = self._indices[edge]
+                if neighbour in banned_nodes or (node, neighbour) in banned_edges:
+                    continue
+                new_cost = cost + self._edge_weights[edge]
+                if new_cost + cost_to[neighbour] > limit:
+                    continue
+                if new_cost < best.get(neighbour, np.inf):
+                    best[neighbour] = new_cost
+                    previous[neighbour] = node
+                    heapq.heappush(queue, (new_cost + cost_to[neighbour], new_cost, neighbour))
+        return None
+
+    def _path_cost(self, nodes):
+        cost = 0.0
+        for node, neighbour in zip(nodes, nodes[1:]):
+            start, end = self._indptr[node], self._indptr[node + 1]
+            cost += self._edge_weights[start + self._indices[start:end].index(neighbour)]
+        return cost
+
+    # Yen's k-shortest loopless paths
+    def _k_shortest(self, source, target, k):
+        cost_to = self._cost_to(target)
+        if cost_to[source] == np.inf:
+            return ()
+        found = [(cost_to[source], self._follow_shortest(source, target, cost_to))]
+        candidates = []
+        seen = {tuple(found[0][1])}
+        while len(found) < k:
+            last = found[-1][1]
+            needed = k - len(found)
+            for i in range(len(last) - 1):
+                root = last[:i + 1]
+                root_cost = self._path_cost(root)
+                banned_edges = {(nodes[i], nodes[i + 1]) for _, nodes in found if nodes[:i + 1] == root}
+                # A spur path only matters if it can beat the candidates we
+                # would otherwise keep
+                limit = np.inf
+                if len(candidates) >= needed:
+                    limit = heapq.nsmallest(needed, candidates)[-1][0] - root_cost
+                spur = self._spur_search(root[-1], target, cost_to, set(root[:-1]), banned_edges, limit + 1e-9)
+                if spur is None:
+                    continue
+                nodes = root[:-1] + spur[1]
+                if tuple(nodes) not in seen:
+                    seen.add(tuple(nodes))
+                    heapq.heappush(candidates, (root_cost + spur[0], nodes))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+        return tuple((cost, tuple(nodes)) for cost, nodes in found)
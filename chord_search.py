@@ -0,0 +1,59 @@
+import bisect
+
+from chord_assets import QUALITY_ALIASES, parse_chord
+from transposition import FLAT_NAMES, SHARP_NAMES
+
+
+# Every way of writing a quality, by canonical quality. Search is not case
+# sensitive, so the aliases that only differ from minor by case (M, M7) are
+# left out; 'maj' and 'maj7' find those chords.
+QUALITY_SYNONYMS = {}
+for _alias, _quality in QUALITY_ALIASES.items():
+    if _alias not in ('M', 'M7'):
+        QUALITY_SYNONYMS.setdefault(_quality, []).append(_alias)
+
+
+# Search form of a name or query: lower case, without spaces, with ASCII
+# accidentals
+def normalize(text):
+    return text.replace(" ", "").replace("♯", "#").replace("♭", "b").lower()
+
+
+# The keys a chord is found under: its root with sharps and with flats,
+# followed by every synonym of its quality. Names that are not chords are
+# found under their own name.
+def search_keys(name):
+    parsed = parse_chord(name)
+    if parsed is None:
+        return {normalize(name)}
+    root, quality = parsed
+    return {normalize(root_name + synonym)
+            for root_name in (SHARP_NAMES[root], FLAT_NAMES[root])
+            for synonym in QUALITY_SYNONYMS.get(quality, [quality])}
+
+
+# Prefix index for type-ahead search over chord names. The (key, chord) pairs
+# of all chords are kept sorted, so the chords under a prefix are one
+# contiguous range found by binary search (a trie flattened into a sorted
+# array), and typing 'gb' finds F#m7 as well as Gb7. Results come in the
+# order of `names`, exact matches first.
+class ChordIndex:
+
+    def __init__(self, names):
+        self.names = list(names)
+        entries = sorted({(key, chord_id) for chord_id, name in enumerate(self.names) for key in search_keys(name)})
+        self.keys = [key for key, _ in entries]
+        self.chord_ids = [chord_id for _, chord_id in entries]
+
+    # Names of the chords with a key starting with `query`, at most `limit`
+    def search(self, query, limit=None):
+        prefix = normalize(query)
+        if not prefix:
+            return self.names[:limit]
+        start = bisect.bisect_left(self.keys, prefix)
+        exact_end = bisect.bisect_right(self.keys, prefix, start)
+        end = bisect.bisect_left(self.keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), exact_end)
+        exact = set(self.chord_ids[start:exact_end])
+        found = set(self.chord_ids[start:end])
+        ranked = sorted(found, key=lambda chord_id: (chord_id not in exact, chord_id))
+        return [self.names[chord_id] for chord_id in ranked[:limit]]
@@ -0,0 +1,94 @@
+import numpy as np
+
+from chord_graph import ChordGraph
+
+
+# Pitch classes 0-11 starting at C, spelled the way the blues data spells them
+PITCH_NAMES = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B']
+
+# Supported chord qualities: name suffix -> (type, color). Colors follow the
+# legend used by the apps.
+QUALITIES = {
+    '':     ('Major', '#4CAF50'),
+    'm':    ('Minor', '#FF5722'),
+    '7':    ('Dominant 7th', '#9C27B0'),
+    'maj7': ('Major 7th', '#4CAF50'),
+    'm7':   ('Minor 7th', '#FF5722'),
+    '6':    ('Sixth', '#FFC107'),
+    '9':    ('Extended (9th)', '#2196F3'),
+    'dim':  ('Diminished', '#FFC107'),
+}
+
+# Transition rules: (source quality, interval in semitones, target quality,
+# relation). Each rule is applied to all 12 roots at once.
+RULES = [
+    # IV and V motion
+    ('',     5, '',     'Fourth progression (IV)'),
+    ('',     7, '7',    'Fifth progression (V)'),
+    ('7',    5, '',     'Dominant resolution'),
+    ('7',    5, '7',    'Fourth resolution'),
+    ('9',    5, '9',    'Fourth progression'),
+    ('m7',   5, '7',    'ii-V progression'),
+    ('maj7', 5, 'maj7', 'Fourth progression (IV)'),
+    # Tritone substitution
+    ('7',    6, '7',    'Tritone substitution'),
+    ('7',   11, '',     'Tritone resolution'),
+    # Relative minor and major
+    ('',     9, 'm',    'Relative minor'),
+    ('',     9, 'm7',   'Relative minor'),
+    ('m',    3, '',     'Relative major'),
+    ('m7',   3, 'maj7', 'Relative major'),
+    # Secondary dominants
+    ('',     0, '7',    'Secondary dominant (V/IV)'),
+    ('',     2, '7',    'Secondary dominant (V/V)'),
+    ('',     4, '7',    'Secondary dominant (V/vi)'),
+    ('',     9, '7',    'Secondary dominant (V/ii)'),
+    # Diminished passing chords
+    ('',     1, 'dim',  'Diminished passing chord'),
+    ('dim',  1, 'm7',   'Diminished passing resolution'),
+    ('dim',  1, '',     'Leading tone resolution'),
+    ('7',    1, 'dim',  'Diminished tension'),
+    # Colour substitutions on the same root
+    ('',     0, '6',    'Sixth substitution'),
+    ('',     0, 'maj7', 'Major seventh colour'),
+    ('',     0, 'm7',   'Minor substitution'),
+    ('7',    0, '9',    'Extension'),
+    ('9',    0, '7',    'Dominant base'),
+    ('6',    0, '',     'Sixth resolution'),
+]
+
+
+# Generate the chord graph for every root and quality from the interval rules.
+# Chord ids are quality * 12 + root, so every rule becomes one vectorised
+# modulo-12 shift over the roots and the whole edge list is built without a
+# Python loop over chords.
+def generate_chord_graph(rules=RULES, qualities=QUALITIES):
+    suffixes = list(qualities)
+    quality_ids = {suffix: i for i, suffix in enumerate(suffixes)}
+    labels = list(dict.fromkeys(rule[3] for rule in rules))
+    label_ids = {label: i for i, label in enumerate(labels)}
+
+    source_quality = np.array([quality_ids[rule[0]] for rule in rules])
+    intervals = np.array([rule[1] for rule in rules])
+    target_quality = np.array([quality_ids[rule[2]] for rule in rules])
+    rule_labels = np.array([label_ids[rule[3]] for rule in rules])
+
+    roots = np.arange(12)
+    sources = (source_quality[:, None] * 12 + roots).ravel()
+    targets = (target_quality[:, None] * 12 + (roots + intervals[:, None]) % 12).ravel()
+    edge_labels = np.repeat(rule_labels, 12)
+
+    # Drop self-loops, keep the first rule for repeated (source, target) pairs
+    # and order the edges by source for the CSR layout
+    num_chords = 12 * len(suffixes)
+    keep = sources != targets
+    sources, targets, edge_labels = sources[keep], targets[keep], edge_labels[keep]
+    _, first = np.unique(sources * num_chords + targets, return_index=True)
+    order = first[np.lexsort((first, sources[first]))]
+    sources, targets, edge_labels = sources[order], targets[order], edge_labels[order]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=num_chords))))
+
+    names = [root + suffix for suffix in suffixes for root in PITCH_NAMES]
+    types = [qualities[suffix][0] for suffix in suffixes for _ in PITCH_NAMES]
+    colors = [qualities[suffix][1] for suffix in suffixes for _ in PITCH_NAMES]
+    return ChordGraph(names, types, colors, indptr, targets, edge_labels, labels)
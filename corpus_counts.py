@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+
+import numpy as np
+
+from atomic_file import atomic_open
+from chord_data import DEFAULT_CACHE_DIR, GENERATED, load_graph
+from progression_validator import ProgressionValidator, ValidationReport
+from transposition import KEYS, transposed_graph
+from worker_pool import init_worker, run_script, worker, worker_pool
+
+
+# Transition counts are stored here, one file per graph version and corpus
+CORPUS_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "corpus")
+
+# Bytes of the corpus counted by one task. There are many more tasks than
+# workers, so a slow chunk does not hold up the rest.
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Unknown chords kept in the stored counts, most common first
+STORED_UNKNOWN_CHORDS = 1000
+
+def _worker_state(graph):
+    return {'validator': ProgressionValidator(graph)}
+
+
+# 'jsonl' or 'csv', from the file extension
+def corpus_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension in ('.csv', '.txt'):
+        return 'csv'
+    raise ValueError(f"{path}: corpus files must be JSON Lines (.jsonl) or CSV (.csv)")
+
+
+# Progression text of every song of a JSON Lines corpus. A JSON line is a list of chord names, a
+# string, or an object with a "chords" or "progression" field holding one of
+# those; any other line is skipped.
+def _progression_lines(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            song = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(song, dict):
+            song = song.get('chords', song.get('progression'))
+        if isinstance(song, str):
+            yield song
+        elif isinstance(song, list):
+            yield " ".join(map(str, song))
+
+
+# Count the songs that start in bytes [start, end) of the corpus. A line
+# belongs to the chunk it starts in, so every line is counted exactly once.
+def _count_chunk(task):
+    path, file_format, start, end = task
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()
+        begin = f.tell()
+        data = f.read(end - begin) if begin < end else b""
+        if data and not data.endswith(b"\n"):
+            data += f.readline()
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    validator = worker['validator']
+    # A CSV line has one chord per column; only the file's first row can be a header
+    if file_format == 'csv':
+        lines = validator.csv_lines(lines, header=start == 0)
+    else:
+        lines = _progression_lines(lines)
+    report = validator.validate_lines(lines)
+    # The parent process has the graph; only the counts travel back
+    report.graph = None
+    return report
+
+
+# Count how often every transition of a graph occurs in a corpus file, one
+# song per line. The file is split into byte ranges that worker processes
+# read and count on their own, so the parent only adds up per-edge count
+# arrays and ingestion scales with the number of cores. Returns a
+# ValidationReport whose edge_counts are the counts.
+def count_corpus(graph, path, workers=None, chunk_bytes=CHUNK_BYTES):
+    file_format = corpus_format(path)
+    size = os.path.getsize(path)
+    tasks = [(path, file_format, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+    report = ValidationReport(graph)
+    if len(tasks) < 2 or workers == 1:
+        init_worker(_worker_state, graph)
+        for part in map(_count_chunk, tasks):
+            report.merge(part)
+        return report
+    with worker_pool(_worker_state, graph, workers=workers) as pool:
+        for part in pool.map(_count_chunk, tasks):
+            report.merge(part)
+    return report
+
+
+# Identifies a corpus file by path, size and modification time, so an edited
+# corpus is counted again
+def corpus_key(path):
+    stat = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:16]
+
+
+def counts_path(graph, path, cache_dir=CORPUS_CACHE_DIR):
+    return os.path.join(cache_dir, f"{graph.version}-{corpus_key(path)}.npz")
+
+
+def save_counts(report, path):
+    unknown = report.unknown_chords.most_common(STORED_UNKNOWN_CHORDS)
+    with atomic_open(path) as f:
+        np.savez(f, edge_counts=report.edge_counts,
+                 totals=np.array([report.progressions, report.chords, report.transitions]),
+                 unknown_names=np.array([name for name, _ in unknown], dtype=str),
+                 unknown_counts=np.array([count for _, count in unknown], dtype=np.int64))
+
+
+# Stored counts of a graph as a ValidationReport, or None if there are none
+# or they do not fit the graph
+def load_counts(graph, path):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if len(data['edge_counts']) != graph.num_edges:
+            return None
+        report = ValidationReport(graph)
+        report.edge_counts = data['edge_counts']
+        report.progressions, report.chords, report.transitions = data['totals'].tolist()
+        report.unknown_chords.update(dict(zip(data['unknown_names'].tolist(), data['unknown_counts'].tolist())))
+    return report
+
+
+# Counts of a corpus for a graph, read from the cache or counted and stored
+def corpus_counts(graph, path, cache_dir=CORPUS_CACHE_DIR, workers=None):
+    stored = counts_path(graph, path, cache_dir)
+    report = load_counts(graph, stored)
+    if report is None:
+        report = count_corpus(graph, path, workers)
+        save_counts(report, stored)
+    return report
+
+
+# Count a corpus in a separate Python process (see worker_pool) and wait for
+# it, for the graph moved to `key` if given. Raises
+# subprocess.CalledProcessError if counting fails.
+def run_count_process(source, path, cache_dir=CORPUS_CACHE_DIR, key=None):
+    args = [source, path, "--cache-dir", cache_dir]
+    if key is not None:
+        args += ["--key", key]
+    run_script(__file__, *args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the transitions of a graph in a corpus of progressions")
+    parser.add_argument("source", help=f"chord data file, or '{GENERATED}' for the 12-key graph")
+    parser.add_argument("corpus", help="JSON Lines or CSV file with one song per line")
+    parser.add_argument("--cache-dir", default=CORPUS_CACHE_DIR)
+    parser.add_argument("--key", choices=KEYS, default=None, help="transpose the graph to this key first")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    graph = load_graph(args.source)
+    if args.key:
+        graph = transposed_graph(graph, args.key)
+    report = corpus_counts(graph, args.corpus, args.cache_dir, args.workers)
+    print(f"{report.progressions} songs, {report.transitions} transitions, {report.coverage:.1%} in the graph")
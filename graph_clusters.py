@@ -0,0 +1,56 @@
+from functools import lru_cache
+
+import numpy as np
+
+from chord_assets import parse_chord
+from chord_theory import PITCH_NAMES
+
+
+# Ways of grouping chords into clusters for the zoomed-out view
+CLUSTER_MODES = ('family', 'root', 'community')
+
+# Names of the colour categories used by the chord data, as in the legends
+FAMILY_NAMES = {
+    '#FFC107': 'Tension',
+    '#9C27B0': 'Dominant',
+    '#4CAF50': 'Resolution',
+    '#FF5722': 'Substitution',
+    '#2196F3': 'Extended',
+}
+
+# Colour of root clusters, which mix every family
+ROOT_CLUSTER_COLOR = '#B0BEC5'
+
+# Colours of community clusters, reused if there are more communities
+COMMUNITY_COLORS = ['#80CBC4', '#CE93D8', '#FFAB91', '#90CAF9', '#E6EE9C', '#F48FB1', '#BCAAA4', '#B0BEC5']
+
+
+# Cluster index of every chord of a graph, and a {id, label, color} dict per
+# cluster. 'family' groups chords by their colour category, 'root' by the
+# root of their name (chords whose name is not a chord share an "Other"
+# cluster) and 'community' by the communities of the graph's metrics.
+# Computed once per graph and mode.
+@lru_cache(maxsize=16)
+def chord_clusters(graph, by):
+    if by == 'family':
+        keys = graph.colors
+    elif by == 'root':
+        keys = [parsed[0] if parsed else None for parsed in map(parse_chord, graph.names)]
+    elif by == 'community':
+        keys = graph.metrics['community'].tolist()
+    else:
+        raise ValueError(f"unknown cluster mode {by!r} (use {', '.join(CLUSTER_MODES)})")
+
+    values = list(dict.fromkeys(keys))
+    value_ids = {value: i for i, value in enumerate(values)}
+    ids = np.array([value_ids[key] for key in keys], dtype=np.int32)
+    clusters = []
+    for i, value in enumerate(values):
+        if by == 'family':
+            label, color = FAMILY_NAMES.get(value, value), value
+        elif by == 'root':
+            label, color = (PITCH_NAMES[value] if value is not None else "Other"), ROOT_CLUSTER_COLOR
+        else:
+            label, color = f"Group {value + 1}", COMMUNITY_COLORS[value % len(COMMUNITY_COLORS)]
+        clusters.append({'id': f"cluster:{by}:{i}", 'label': label, 'color': color})
+    return ids, clusters
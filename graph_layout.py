@@ -0,0 +1,126 @@
+import numpy as np
+from scipy.signal import fftconvolve
+
+
+# Above this many chords, repulsion is approximated on a grid: chords in the
+# same cell repel each other exactly, other cells push as a whole from their
+# centre (a particle-mesh scheme, so a step costs O(n + cells log cells))
+EXACT_REPULSION_LIMIT = 1000
+
+# Average number of chords per grid cell in the approximation
+CHORDS_PER_CELL = 16
+
+# Strength of the pull towards the centre of the layout
+GRAVITY = 0.1
+
+# Rows of the pairwise repulsion computed at once, to bound memory
+REPULSION_BLOCK_SIZE = 256
+
+
+# Fruchterman-Reingold force-directed layout of n chords joined by the
+# (sources[i], targets[i]) transitions, direction ignored. Every step is
+# vectorized over all chords and edges. Returns an (n, 2) float32 array of
+# coordinates centered on 0 and scaled so an average transition is about
+# `edge_length` long. The same inputs and seed always give the same layout.
+def force_layout(n, sources, targets, edge_length=200, iterations=150, seed=0):
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    sources = np.asarray(sources, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+
+    rng = np.random.default_rng(seed)
+    positions = rng.random((n, 2))
+    k = 1.0 / np.sqrt(n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = _repulsion(positions, k)
+
+        # Attraction along transitions: d^2 / k towards each other
+        delta = positions[sources] - positions[targets]
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+        pull = delta * (distance / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(sources, pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(targets, pull[:, axis], minlength=n)
+
+        # Gravity towards the centre keeps loosely connected chords close
+        displacement -= (positions - positions.mean(axis=0)) * (GRAVITY / k)
+
+        # Move each chord at most `temperature`
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-9)
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    positions -= positions.mean(axis=0)
+    if len(sources):
+        delta = positions[sources] - positions[targets]
+        mean_length = np.hypot(delta[:, 0], delta[:, 1]).mean()
+    else:
+        mean_length = k
+    if mean_length > 0:
+        positions *= edge_length / mean_length
+    return positions.astype(np.float32)
+
+
+# Repulsive displacement k^2 / d between chords, exact for small graphs and
+# approximated on a grid for large ones
+def _repulsion(positions, k):
+    if len(positions) > EXACT_REPULSION_LIMIT:
+        return _grid_repulsion(positions, k)
+    return _pairwise_repulsion(positions, positions, k)
+
+
+# Repulsion of every chord at `points` by every chord at `sources`
+def _pairwise_repulsion(points, sources, k):
+    displacement = np.zeros_like(points)
+    for start in range(0, len(points), REPULSION_BLOCK_SIZE):
+        block = points[start:start + REPULSION_BLOCK_SIZE]
+        delta = block[:, None, :] - sources[None, :, :]
+        distance_sq = (delta ** 2).sum(axis=2)
+        weight = k * k / np.maximum(distance_sq, 1e-12)
+        weight[distance_sq == 0] = 0
+        displacement[start:start + len(block)] = (delta * weight[:, :, None]).sum(axis=1)
+    return displacement
+
+
+def _grid_repulsion(positions, k):
+    n = len(positions)
+    side = max(1, int(np.sqrt(n / CHORDS_PER_CELL)))
+    # A square grid over the occupied area, so it stays fine where chords crowd
+    low = positions.min(axis=0)
+    cell_size = max((positions.max(axis=0) - low).max(), 1e-12) / side
+    cell_xy = np.minimum(((positions - low) / cell_size).astype(np.intp), side - 1)
+    cells = cell_xy[:, 0] * side + cell_xy[:, 1]
+
+    # Far field: the chord count of every cell, placed at its centre,
+    # convolved with the repulsion kernel by FFT gives the push from all other
+    # cells at every cell centre
+    counts = np.bincount(cells, minlength=side * side)
+    mass = counts.reshape(side, side).astype(np.float64)
+    offsets = np.arange(1 - side, side) * cell_size
+    offset_x, offset_y = np.meshgrid(offsets, offsets, indexing='ij')
+    distance_sq = offset_x ** 2 + offset_y ** 2
+    distance_sq[side - 1, side - 1] = np.inf
+    displacement = np.empty_like(positions)
+    for axis, offset in enumerate((offset_x, offset_y)):
+        field = fftconvolve(mass, k * k * offset / distance_sq, mode='valid')
+        displacement[:, axis] = field.ravel()[cells]
+
+    # Near field: all ordered pairs of chords sharing a cell, exactly
+    order = np.argsort(cells, kind="stable")
+    cell_starts = np.cumsum(counts) - counts
+    partners_per_chord = counts[cells]
+    first = np.repeat(np.arange(n), partners_per_chord)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(partners_per_chord) - partners_per_chord, partners_per_chord)
+    second = order[np.repeat(cell_starts[cells], partners_per_chord) + offsets]
+    distinct = first != second
+    first, second = first[distinct], second[distinct]
+    delta = positions[first] - positions[second]
+    push = delta * (k * k / np.maximum((delta ** 2).sum(axis=1), 1e-12))[:, None]
+    for axis in range(2):
+        displacement[:, axis] += np.bincount(first, push[:, axis], minlength=n)
+    return displacement
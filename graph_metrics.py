@@ -0,0 +1,140 @@
+import numpy as np
+from scipy import sparse
+
+
+# PageRank damping factor and convergence tolerance (L1 change per step)
+DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_ITERATIONS = 200
+
+# Betweenness is exact up to this many chords. Larger graphs use this many
+# randomly picked source chords and scale the result up (Brandes-Pich).
+BETWEENNESS_EXACT_LIMIT = 2000
+BETWEENNESS_SAMPLES = 512
+
+# Source chords whose shortest paths are counted together
+BETWEENNESS_BLOCK_SIZE = 256
+
+COMMUNITY_ITERATIONS = 50
+
+
+# Centrality and community of every chord of a ChordGraph, all computed on
+# scipy sparse matrices of the transitions. Returns a dict of arrays indexed
+# by chord id: 'pagerank' (sums to 1), 'in_degree', 'out_degree',
+# 'betweenness' (normalised to 0..1) and 'community' (0 is the largest).
+def graph_metrics(graph, seed=0):
+    n = len(graph)
+    # Copy the CSR arrays: sum_duplicates() sorts each row in place, which
+    # would reorder the graph's indices without its edge labels (and fails on
+    # the read-only arrays of an mmap'd artifact)
+    adjacency = sparse.csr_matrix((np.ones(graph.num_edges), graph.indices.copy(), graph.indptr.copy()),
+                                  shape=(n, n))
+    adjacency.sum_duplicates()
+    adjacency.data[:] = 1
+    return {
+        'pagerank': pagerank(adjacency),
+        'in_degree': np.diff(adjacency.tocsc().indptr),
+        'out_degree': np.diff(adjacency.indptr),
+        'betweenness': betweenness(adjacency, seed=seed),
+        'community': communities(adjacency),
+    }
+
+
+# PageRank by power iteration; chords without transitions spread their rank
+# evenly over all chords
+def pagerank(adjacency, damping=DAMPING):
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    # Column-stochastic transpose: rank flows along each transition
+    transition = sparse.diags(1.0 / np.where(dangling, 1, out_degree)) @ adjacency
+    transition = transition.T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(PAGERANK_ITERATIONS):
+        previous = rank
+        rank = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(rank - previous).sum() < PAGERANK_TOLERANCE:
+            break
+    return rank / rank.sum()
+
+
+# Betweenness centrality of the directed, unweighted graph with Brandes'
+# algorithm, run for a block of sources at once: the breadth-first search
+# that counts shortest paths and the accumulation of dependencies are both
+# sparse matrix products over all sources of the block.
+def betweenness(adjacency, seed=0):
+    n = adjacency.shape[0]
+    if n <= BETWEENNESS_EXACT_LIMIT:
+        sources = np.arange(n)
+    else:
+        sources = np.sort(np.random.default_rng(seed).choice(n, BETWEENNESS_SAMPLES, replace=False))
+    forward = adjacency.T.tocsr().astype(np.float64)
+    backward = adjacency.tocsr().astype(np.float64)
+
+    scores = np.zeros(n)
+    for start in range(0, len(sources), BETWEENNESS_BLOCK_SIZE):
+        block = sources[start:start + BETWEENNESS_BLOCK_SIZE]
+        columns = np.arange(len(block))
+        level = np.full((n, len(block)), -1, dtype=np.int32)
+        level[block, columns] = 0
+        paths = np.zeros((n, len(block)))
+        paths[block, columns] = 1
+
+        # Count shortest paths level by level
+        depth = 0
+        while True:
+            reached = forward @ np.where(level == depth, paths, 0)
+            new = (reached > 0) & (level < 0)
+            if not new.any():
+                break
+            depth += 1
+            level[new] = depth
+            paths[new] = reached[new]
+
+        # Accumulate dependencies from the deepest level back to the sources
+        dependency = np.zeros((n, len(block)))
+        for depth in range(depth, 0, -1):
+            at_depth = level == depth
+            share = np.where(at_depth, (1 + dependency) / np.where(at_depth, paths, 1), 0)
+            pulled = backward @ share
+            before = level == depth - 1
+            dependency[before] += paths[before] * pulled[before]
+        dependency[block, columns] = 0
+        scores += dependency.sum(axis=1)
+
+    scores *= n / len(sources) if len(sources) else 0
+    if n > 2:
+        scores /= (n - 1) * (n - 2)
+    return scores
+
+
+# Communities by label propagation on the transitions taken as undirected:
+# every chord repeatedly adopts the label most common among itself and its
+# neighbours (ties go to the smaller label) until nothing changes. Labels
+# are renumbered by community size, largest first.
+def communities(adjacency):
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+    undirected = ((adjacency + adjacency.T + sparse.identity(n, format='csr')) > 0).tocoo()
+    rows, cols = undirected.row, undirected.col
+    labels = np.arange(n)
+    for _ in range(COMMUNITY_ITERATIONS):
+        # Count (chord, neighbour label) pairs, then keep each chord's most
+        # frequent label; sorting by (chord, -count, label) puts it first
+        pairs, counts = np.unique(rows.astype(np.int64) * n + labels[cols], return_counts=True)
+        chords, neighbour_labels = pairs // n, pairs % n
+        order = np.lexsort((neighbour_labels, -counts, chords))
+        first = order[np.r_[True, chords[order][1:] != chords[order][:-1]]]
+        updated = np.empty(n, dtype=labels.dtype)
+        updated[chords[first]] = neighbour_labels[first]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    _, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int32)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return rank[inverse]
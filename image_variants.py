@@ -0,0 +1,116 @@
+import io
+import os
+import threading
+
+from PIL import Image
+
+from atomic_file import write_atomic
+from network_render import STATIC_DIR, STATIC_URL
+
+
+# Variants are written here, so Streamlit serves them as static files. The
+# directory persists across restarts and acts as the cache.
+VARIANT_DIR = os.path.join(STATIC_DIR, "variants")
+
+# Sizes chord images are displayed at, in CSS pixels
+DISPLAY_SIZES = {
+    'strip': (130, 150),
+    'hover': (100, 100),
+}
+
+# Variants have this many image pixels per CSS pixel, so they stay sharp on
+# high-density screens
+PIXEL_RATIO = 2
+
+# Encodings tried for every variant: (extension, PIL format, save options).
+# Only the smallest file is kept; line drawings often compress best as PNG
+# or lossless WebP, photos and scans as lossy WebP.
+ENCODINGS = [
+    ('png', 'PNG', {'optimize': True}),
+    ('webp', 'WEBP', {'lossless': True, 'method': 6}),
+    ('webp', 'WEBP', {'quality': 85, 'method': 6}),
+]
+
+
+# Encode an image in every format of ENCODINGS and return (extension, bytes)
+# of the smallest
+def encode_smallest(image):
+    best = None
+    for extension, image_format, options in ENCODINGS:
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **options)
+        if best is None or buffer.tell() < len(best[1]):
+            best = (extension, buffer.getvalue())
+    return best
+
+
+# Path of the file saved for `stem` (a path without extension), or None
+def find_variant(stem):
+    for extension in dict.fromkeys(extension for extension, _, _ in ENCODINGS):
+        if os.path.exists(f"{stem}.{extension}"):
+            return f"{stem}.{extension}"
+    return None
+
+
+# Save an image as the smallest encoding under `stem`, unless a file for that
+# stem exists already, and return its path
+def save_smallest(image, stem):
+    path = find_variant(stem)
+    if path is None:
+        extension, data = encode_smallest(image)
+        path = f"{stem}.{extension}"
+        write_atomic(path, data)
+    return path
+
+
+def static_url(path):
+    return STATIC_URL + os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
+
+
+# Downscaled copies of the chord images of an asset manifest, one per image
+# content and display size. A variant is made on first request and kept on
+# disk under a name derived from the image hash, so it is made once per
+# image, not once per process. Images already smaller than the display size
+# are re-encoded but never enlarged; SVG images are used as they are.
+class ImageVariants:
+
+    def __init__(self, manifest, variant_dir=VARIANT_DIR):
+        self.manifest = manifest
+        self.variant_dir = variant_dir
+        self._urls = {}
+        self._lock = threading.Lock()
+
+    # URL of the variant of a chord's image for a display size, given by name
+    # or as (width, height) in CSS pixels. Returns None if there is no image.
+    def url(self, chord, size):
+        if chord not in self.manifest:
+            return None
+        width, height = DISPLAY_SIZES.get(size, size)
+        key = (self.manifest.digest(chord), width, height)
+        with self._lock:
+            url = self._urls.get(key)
+        if url is None:
+            url = static_url(self._make(chord, key))
+            with self._lock:
+                self._urls[key] = url
+        return url
+
+    # {chord: variant URL} for the chords that have an image
+    def urls(self, chords, size):
+        return {chord: self.url(chord, size) for chord in chords if chord in self.manifest}
+
+    def _make(self, chord, key):
+        digest, width, height = key
+        stem = os.path.join(self.variant_dir, f"{digest[:16]}-{width}x{height}")
+        if self.manifest.mime_type(chord) == "image/svg+xml":
+            path = f"{stem}.svg"
+            if not os.path.exists(path):
+                write_atomic(path, self.manifest.read(chord))
+            return path
+        path = find_variant(stem)
+        if path is None:
+            with Image.open(io.BytesIO(self.manifest.read(chord))) as image:
+                image = image.convert("RGBA")
+                image.thumbnail((width * PIXEL_RATIO, height * PIXEL_RATIO), Image.LANCZOS)
+                path = save_smallest(image, stem)
+        return path
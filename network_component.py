@@ -0,0 +1,86 @@
+from functools import partial
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from network_render import DEFAULT_STYLE, STATIC_DIR, lod_json, style_fields, view_fragments
+
+
+# Frontend: static/index.html and static/chord_component.js, next to the
+# vendored vis-network bundle
+_component = components.declare_component("chord_network", path=STATIC_DIR)
+
+
+# Show a chord network in a component that keeps one vis-network instance
+# alive for the whole session. The first render sends the full view; later
+# reruns only send the nodes and edges added, changed or removed since the
+# view this session last sent, so the iframe never reloads.
+#
+# The frontend only applies a change on top of the revision it shows. If it
+# has missed one (it was reloaded, or a rerun was interrupted), it sets the
+# component value to a new sync token and the next rerun sends everything.
+#
+# Clicking a chord calls on_select(chord) as a widget callback, before the
+# rerun it triggers, so it can set the state of other widgets. Hovering a
+# chord shows its diagram if `diagrams` is the URL of a hover diagram map.
+# `weights` are per-edge counts drawn as edge width and opacity. Returns the
+# last clicked chord.
+def chord_network(graph, selected_chord=None, hops=1, paths=(), style=DEFAULT_STYLE, key="chord_network",
+                  on_select=None, diagrams=None, weights=None):
+    nodes, edges = view_fragments(graph, selected_chord, hops, paths, style, weights)
+    fields = dict(style_fields(style), lod=lod_json(graph, style))
+    selected = selected_chord if selected_chord in graph.index else None
+
+    sent_key = f"{key}_sent"
+    sent = st.session_state.get(sent_key)
+    sync = (st.session_state.get(key) or {}).get('sync')
+    full = (sent is None or sent['version'] != graph.version
+            or sent['fields'] != fields or sent['sync'] != sync)
+
+    if (full or sent['nodes'] != nodes or sent['edges'] != edges or sent['selected'] != selected
+            or sent['diagrams'] != diagrams):
+        old_nodes, old_edges = ({}, {}) if full else (sent['nodes'], sent['edges'])
+        revision = sent['revision'] + 1 if sent else 1
+        args = {
+            'revision': revision,
+            'base': 0 if full else sent['revision'],
+            'selected': selected,
+            'diagrams': diagrams,
+            'nodes': "[" + ", ".join(fragment for chord_id, fragment in nodes.items()
+                                     if old_nodes.get(chord_id) != fragment) + "]",
+            'removed_nodes': [graph.names[chord_id] for chord_id in old_nodes if chord_id not in nodes],
+            'edges': "[" + ", ".join(fragment for edge, fragment in edges.items()
+                                     if old_edges.get(edge) != fragment) + "]",
+            'removed_edges': [edge for edge in old_edges if edge not in edges],
+        }
+        if full:
+            args.update(fields)
+        st.session_state[sent_key] = {
+            'version': graph.version,
+            'fields': fields,
+            'sync': sync,
+            'revision': revision,
+            'selected': selected,
+            'diagrams': diagrams,
+            'nodes': nodes,
+            'edges': edges,
+            'args': args,
+        }
+    else:
+        # Nothing changed: repeat the last message, which the frontend ignores
+        args = sent['args']
+
+    on_change = partial(_handle_click, key, on_select) if on_select else None
+    value = _component(key=key, default=None, on_change=on_change, **args)
+    click = (value or {}).get('click')
+    return click['chord'] if click else None
+
+
+# Call on_select for a click the session has not seen yet; a changed value can
+# also be a sync request
+def _handle_click(key, on_select):
+    click = (st.session_state.get(key) or {}).get('click')
+    handled_key = f"{key}_click"
+    if click and click['token'] != st.session_state.get(handled_key):
+        st.session_state[handled_key] = click['token']
+        on_select(click['chord'])
@@ -0,0 +1,307 @@
+import copy
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+import chord_graph
+import graph_clusters
+import graph_layout
+import graph_metrics
+from graph_clusters import CLUSTER_MODES, chord_clusters
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# URL Streamlit serves STATIC_DIR at when server.enableStaticServing is set.
+# The pages are srcdoc iframes, so this resolves against the app's own origin.
+STATIC_URL = "/app/static/"
+
+# Vendored scripts and styles loaded by every page
+STATIC_ASSETS = {
+    'vis_css': "vis-network.min.css",
+    'vis_js': "vis-network.min.js",
+    'chord_js': "chord_network.js",
+}
+
+
+# URL of a vendored file, versioned by a hash of its content so browsers can
+# keep it until the file actually changes
+def _asset_url(name):
+    with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    return f"{STATIC_URL}{name}?v={digest}"
+
+
+ASSET_URLS = {field: _asset_url(name) for field, name in STATIC_ASSETS.items()}
+
+# Pages embed the asset URLs, and the positions, sizes, clusters and
+# tooltips computed by these modules, so all of them are part of the
+# renderer version
+RENDERER_MODULES = [__file__, chord_graph.__file__, graph_clusters.__file__, graph_layout.__file__,
+                    graph_metrics.__file__]
+
+
+def _renderer_hash():
+    digest = hashlib.sha1(repr(sorted(ASSET_URLS.items())).encode('utf-8'))
+    for path in RENDERER_MODULES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+RENDERER_HASH = _renderer_hash()
+
+PATH_COLORS = ['#FFD700', '#FFA000']
+
+# Level of detail: views of at least LOD_MIN_CHORDS chords collapse each
+# cluster into one node when zoomed out below LOD_SCALE, so the browser draws
+# a bounded number of nodes and edges however large the vocabulary gets.
+# Edge labels stop being drawn at the same zoom (drawThreshold in the style).
+# The LOD_HUBS chords with the highest PageRank always stay visible.
+LOD_MIN_CHORDS = 40
+LOD_SCALE = 0.5
+LOD_HUBS = 5
+
+# Width and opacity of transitions weighted by corpus counts, from the
+# rarest to the most common
+EDGE_WIDTHS = (1, 8)
+EDGE_OPACITIES = (0.2, 1.0)
+
+# Page and vis-network settings of the blues graph. Other apps pass their own
+# style; it is part of the render cache key. Node positions come from the
+# graph's layout (spring_length is the average transition length in pixels),
+# so the browser runs no physics. cluster_by is one of CLUSTER_MODES, or None
+# to always draw every chord.
+DEFAULT_STYLE = {
+    'height': '600px',
+    'width': '100%',
+    'bgcolor': '#222222',
+    'font_color': 'white',
+    'spring_length': 200,
+    'cluster_by': 'family',
+    'options': {
+        "nodes": {
+            "fixed": {
+                "x": False,
+                "y": False
+            },
+            "physics": False,
+            "shape": "dot",
+            "scaling": {
+                "min": 10,
+                "max": 40
+            }
+        },
+        "edges": {
+            "arrows": {
+                "to": {"enabled": True, "type": "arrow"}
+            },
+            "font": {
+                "size": 14,
+                "strokeWidth": 0,
+                "color": "white"
+            },
+            "scaling": {
+                "label": {"drawThreshold": 14 * LOD_SCALE + 1}
+            },
+            "smooth": {
+                "type": "continuous",
+                "roundness": 0.9
+            }
+        },
+        "physics": {
+            "enabled": False
+        },
+        "interaction": {
+            "dragNodes": True,
+            "dragView": True,
+            "zoomView": True,
+            "navigationButtons": True,
+            "hover": True
+        },
+        "manipulation": {
+            "enabled": False
+        }
+    },
+}
+
+PAGE_TEMPLATE = """<html>
+    <head>
+        <meta charset="utf-8">
+        <link rel="stylesheet" href="{{vis_css}}" />
+        <script src="{{vis_js}}"></script>
+        <script src="{{chord_js}}"></script>
+        <style type="text/css">
+            body {
+                margin: 0;
+            }
+            #mynetwork {
+                width: {{width}};
+                height: {{height}};
+                background-color: {{bgcolor}};
+                border: 1px solid lightgray;
+                position: relative;
+                float: left;
+            }
+        </style>
+    </head>
+    <body>
+        <div id="mynetwork"></div>
+        <script type="text/javascript">
+            var network = drawChordNetwork({{nodes}}, {{edges}}, {{options}}, {{selected}}, {{diagrams}}, {{lod}});
+        </script>
+    </body>
+</html>
+"""
+
+# The template is split once into literal text (even positions) and field
+# names (odd positions); rendering only fills the fields and joins.
+_PAGE_PARTS = re.split(r"\{\{(\w+)\}\}", PAGE_TEMPLATE)
+
+
+def _fill_page(fields):
+    parts = list(_PAGE_PARTS)
+    parts[1::2] = [fields[name] for name in _PAGE_PARTS[1::2]]
+    return "".join(parts)
+
+
+# JSON for every node and edge of a graph, serialized once per graph. A page
+# only joins the fragments of the chords it shows. Fragments are kept without
+# their closing brace so positions and path highlighting can be appended.
+# Nodes carry their cluster in every mode, so the browser can group them,
+# and are sized by PageRank (1 is an average chord).
+@lru_cache(maxsize=8)
+def _graph_fragments(graph):
+    cluster_ids = {by: chord_clusters(graph, by)[0].tolist() for by in CLUSTER_MODES}
+    pagerank = graph.metrics['pagerank']
+    values = np.round(pagerank * len(graph), 3).tolist()
+    hubs = set(np.argsort(-pagerank, kind='stable')[:LOD_HUBS].tolist())
+    nodes = [json.dumps({"id": name, "label": name, "title": tooltip, "color": color, "value": values[i],
+                         **{by: cluster_ids[by][i] for by in CLUSTER_MODES},
+                         **({"hub": True} if i in hubs else {})})[:-1]
+             for i, (name, tooltip, color) in enumerate(zip(graph.names, graph.tooltips, graph.colors))]
+    sources = np.repeat(np.arange(len(graph)), np.diff(graph.indptr)).tolist()
+    edges = [json.dumps({"id": edge, "from": graph.names[source], "to": graph.names[target],
+                         "label": graph.labels[label], "title": graph.labels[label]})[:-1]
+             for edge, (source, target, label) in enumerate(zip(sources, graph.indices.tolist(), graph.edge_labels.tolist()))]
+    return nodes, edges
+
+
+# Page fields of a style: canvas size and colour, and the vis options as JSON
+def style_fields(style):
+    return _style_fields(json.dumps(style, sort_keys=True))
+
+
+@lru_cache(maxsize=16)
+def _style_fields(style_json):
+    style = json.loads(style_json)
+    options = copy.deepcopy(style['options'])
+    options.setdefault('nodes', {})['font'] = {'color': style['font_color']}
+    return {
+        'width': style['width'],
+        'height': style['height'],
+        'bgcolor': style['bgcolor'],
+        'options': json.dumps(options),
+    }
+
+
+# Level of detail settings of a page as JSON: the clusters of the style's
+# mode, as {id, by, value, label, color} with `by`/`value` the node property
+# that selects its chords, and the LOD thresholds. "null" if clustering is off.
+def lod_json(graph, style=DEFAULT_STYLE):
+    return _lod_json(graph, style.get('cluster_by'))
+
+
+@lru_cache(maxsize=16)
+def _lod_json(graph, by):
+    if by is None:
+        return "null"
+    clusters = [dict(cluster, by=by, value=i) for i, cluster in enumerate(chord_clusters(graph, by)[1])]
+    return json.dumps({'clusters': clusters, 'min_chords': LOD_MIN_CHORDS, 'scale': LOD_SCALE})
+
+
+# Chords shown for a selection: the chord and everything within `hops`
+# transitions of it, plus every chord on a highlighted path
+def visible_chord_ids(graph, selected_chord=None, hops=1, paths=()):
+    if selected_chord:
+        if selected_chord in graph.index:
+            visible_ids = set(graph.within_hops(selected_chord, hops).tolist())
+        else:
+            visible_ids = set()
+    else:
+        visible_ids = set(range(len(graph)))
+    for path in paths:
+        visible_ids.update(graph.index[chord] for chord in path)
+    return visible_ids
+
+
+# Width and opacity of every edge from per-edge counts, on a log scale so a
+# few very common transitions do not make all others look alike
+def edge_weight_styles(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    scaled = np.log1p(counts) / np.log1p(max(counts.max(initial=0), 1))
+    widths = EDGE_WIDTHS[0] + scaled * (EDGE_WIDTHS[1] - EDGE_WIDTHS[0])
+    opacities = EDGE_OPACITIES[0] + scaled * (EDGE_OPACITIES[1] - EDGE_OPACITIES[0])
+    return widths, opacities
+
+
+# JSON of the nodes and edges in a view, as {chord id: node} and
+# {edge id: edge} dicts of serialized objects. `weights` are per-edge counts
+# (corpus_counts) drawn as edge width and opacity, if any.
+def view_fragments(graph, selected_chord=None, hops=1, paths=(), style=DEFAULT_STYLE, weights=None):
+    node_json, edge_json = _graph_fragments(graph)
+    visible_ids = visible_chord_ids(graph, selected_chord, hops, paths)
+
+    # The best path is drawn in gold, the alternatives in orange
+    path_edges = {}
+    for rank, path in reversed(list(enumerate(paths))):
+        path_ids = [graph.index[chord] for chord in path]
+        for source, target in zip(path_ids, path_ids[1:]):
+            path_edges[(source, target)] = PATH_COLORS[min(rank, 1)]
+
+    # Every view is a slice of the whole graph's layout
+    ids = sorted(visible_ids)
+    positions = (graph.layout[ids] * style['spring_length']).tolist()
+    nodes = {chord_id: f'{node_json[chord_id]}, "x": {x:.1f}, "y": {y:.1f}}}'
+             for chord_id, (x, y) in zip(ids, positions)}
+    if weights is not None:
+        widths, opacities = edge_weight_styles(weights)
+    edges = {}
+    for edge, source, target in graph.edges_within(visible_ids):
+        if (source, target) in path_edges:
+            edges[edge] = f'{edge_json[edge]}, "color": "{path_edges[(source, target)]}", "width": 4}}'
+        elif weights is not None:
+            edges[edge] = f'{edge_json[edge]}, "width": {widths[edge]:.1f}, "color": {{"opacity": {opacities[edge]:.2f}}}}}'
+        else:
+            edges[edge] = edge_json[edge] + "}"
+    return nodes, edges
+
+
+# Render the network page for a selection entirely in memory. `diagrams` is
+# the URL of a hover diagram map (chord_diagrams.hover_diagram_map), if any.
+def render_network_html(graph, selected_chord=None, hops=1, paths=(), style=DEFAULT_STYLE, diagrams=None,
+                        weights=None):
+    nodes, edges = view_fragments(graph, selected_chord, hops, paths, style, weights)
+    fields = dict(ASSET_URLS)
+    fields.update(style_fields(style))
+    fields['selected'] = json.dumps(selected_chord if selected_chord in graph.index else None)
+    fields['nodes'] = "[" + ", ".join(nodes.values()) + "]"
+    fields['edges'] = "[" + ", ".join(edges.values()) + "]"
+    fields['diagrams'] = json.dumps(diagrams)
+    fields['lod'] = lod_json(graph, style)
+    return _fill_page(fields)
+
+
+# Cache key of one rendered view. RENDERER_HASH changes whenever this module
+# or one of the RENDERER_MODULES changes, so pages rendered by older code are
+# never reused.
+def view_key(graph, selected_chord=None, hops=1, paths=(), style=DEFAULT_STYLE, diagrams=None, weights=None):
+    weights_hash = None
+    if weights is not None:
+        weights_hash = hashlib.sha1(np.ascontiguousarray(weights, dtype=np.int64).tobytes()).hexdigest()[:12]
+    return (graph.version, selected_chord, hops, tuple(map(tuple, paths)),
+            json.dumps(style, sort_keys=True), diagrams, weights_hash, RENDERER_HASH)
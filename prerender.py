@@ -0,0 +1,64 @@
+import argparse
+import os
+import subprocess
+
+from chord_assets import AssetManifest
+from chord_data import DEFAULT_CACHE_DIR, GENERATED, load_graph
+from chord_diagrams import hover_diagram_map
+from image_variants import ImageVariants
+from network_render import render_network_html, view_key
+from render_cache import DiskRenderCache
+from worker_pool import start_script, worker, worker_pool
+
+
+HTML_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "html")
+
+def _worker_state(graph, diagrams, cache_dir):
+    return {'graph': graph, 'diagrams': diagrams, 'disk': DiskRenderCache(cache_dir)}
+
+
+def _render_view(selected_chord):
+    graph, diagrams, disk = worker['graph'], worker['diagrams'], worker['disk']
+    key = view_key(graph, selected_chord, diagrams=diagrams)
+    if key not in disk:
+        disk.put(key, render_network_html(graph, selected_chord, diagrams=diagrams))
+    return selected_chord
+
+
+# Render the unfiltered view and the default view of every chord into the disk
+# cache, spread over a pool of worker processes. Views already on disk for
+# this graph version, set of diagrams and renderer are skipped. If `source`
+# is given, the pages of its previous graph version are deleted. Returns the
+# number rendered.
+def prerender_views(graph, cache_dir=HTML_CACHE_DIR, workers=None, source=None):
+    disk = DiskRenderCache(cache_dir)
+    if source is not None:
+        disk.set_current(source if source == GENERATED else os.path.abspath(source), graph.version)
+    diagrams = hover_diagram_map(graph.names, ImageVariants(AssetManifest(watch=False)))
+    missing = [chord for chord in [None] + graph.names
+               if view_key(graph, chord, diagrams=diagrams) not in disk]
+    if not missing:
+        return 0
+
+    # Compute the hop matrix, layout and metrics once here so the workers
+    # receive them with the graph
+    graph.hop_distances
+    graph.layout
+    graph.metrics
+    with worker_pool(_worker_state, graph, diagrams, cache_dir, workers=workers) as pool:
+        return len(list(pool.map(_render_view, missing, chunksize=8)))
+
+
+# Start prerendering in a separate Python process (see worker_pool)
+def start_prerender_process(source, cache_dir=HTML_CACHE_DIR):
+    return start_script(__file__, source, "--cache-dir", cache_dir, stdout=subprocess.DEVNULL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every chord view of a graph into the page cache")
+    parser.add_argument("source", help=f"chord data file, or '{GENERATED}' for the 12-key graph")
+    parser.add_argument("--cache-dir", default=HTML_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    count = prerender_views(load_graph(args.source), args.cache_dir, args.workers, args.source)
+    print(f"Rendered {count} views into {args.cache_dir}")
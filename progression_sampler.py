@@ -0,0 +1,88 @@
+import numpy as np
+
+from chord_paths import relation_weight
+
+
+# Random progressions from a ChordGraph walked as a Markov chain.
+#
+# The next chord is drawn among the transitions of the current one, with
+# probability proportional to the transition's weight. By default a
+# transition is as likely as it is cheap for the path planner (1 / relation
+# weight); corpus counts or any other per-edge weights can be passed instead.
+# Every chord gets a Walker/Vose alias table over its transitions, built
+# once, so drawing a step costs two random numbers whatever the chord's
+# degree, and all progressions of a batch advance together as NumPy arrays.
+class ProgressionSampler:
+
+    def __init__(self, graph, edge_weights=None):
+        self.graph = graph
+        if edge_weights is None:
+            label_weights = np.array([1.0 / relation_weight(label) for label in graph.labels] or [1.0])
+            edge_weights = label_weights[graph.edge_labels]
+        edge_weights = np.asarray(edge_weights, dtype=np.float64)
+        if len(edge_weights) != graph.num_edges or (edge_weights < 0).any():
+            raise ValueError("edge_weights needs one non-negative weight per transition")
+        self.edge_weights = edge_weights
+        self.degrees = np.diff(graph.indptr)
+        self.accept, self.alias = _alias_tables(graph.indptr, edge_weights)
+
+    # `count` progressions of up to `length` chords starting at `start`, as a
+    # (count, length) array of chord ids. A walk that reaches a chord without
+    # transitions stops there; the rest of its row is -1.
+    def sample_ids(self, start, length, count=1, seed=None):
+        rng = np.random.default_rng(seed)
+        walks = np.full((count, length), -1, dtype=np.int32)
+        current = np.full(count, self.graph.index[start], dtype=np.int32)
+        walks[:, 0] = current
+        alive = np.arange(count)
+        indptr, indices = self.graph.indptr, self.graph.indices
+        for step in range(1, length):
+            degree = self.degrees[current]
+            moving = degree > 0
+            alive, current, degree = alive[moving], current[moving], degree[moving]
+            if len(alive) == 0:
+                break
+            # Pick a transition slot uniformly, then keep it or take its alias
+            edge = indptr[current] + (rng.random(len(alive)) * degree).astype(np.int32)
+            keep = rng.random(len(alive)) < self.accept[edge]
+            edge = np.where(keep, edge, self.alias[edge])
+            current = indices[edge]
+            walks[alive, step] = current
+        return walks
+
+    # Progressions as lists of chord names
+    def sample(self, start, length, count=1, seed=None):
+        names = self.graph.names
+        return [[names[chord_id] for chord_id in walk if chord_id >= 0]
+                for walk in self.sample_ids(start, length, count, seed).tolist()]
+
+
+# Alias tables over the edges of every row of a CSR matrix (Vose's method).
+# Slot j of a row keeps its own edge with probability accept[j] and
+# otherwise takes edge alias[j] of the same row. Rows whose weights are all
+# zero draw uniformly.
+def _alias_tables(indptr, weights):
+    accept = np.ones(len(weights))
+    alias = np.arange(len(weights), dtype=np.int32)
+    for row in range(len(indptr) - 1):
+        start, end = int(indptr[row]), int(indptr[row + 1])
+        degree = end - start
+        if degree < 2:
+            continue
+        total = weights[start:end].sum()
+        if total <= 0:
+            continue
+        scaled = (weights[start:end] * (degree / total)).tolist()
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            low, high = small.pop(), large[-1]
+            accept[start + low] = scaled[low]
+            alias[start + low] = start + high
+            scaled[high] -= 1 - scaled[low]
+            if scaled[high] < 1:
+                small.append(large.pop())
+        # Whatever is left is 1 up to rounding
+        for i in small + large:
+            accept[start + i] = 1.0
+    return accept, alias
@@ -0,0 +1,214 @@
+import csv
+import io
+import itertools
+from collections import Counter
+
+import numpy as np
+
+from chord_assets import canonical_chord_id
+
+
+# Lines read and checked together when validating a file
+CHUNK_LINES = 65536
+
+# Characters that separate chords in a progression besides whitespace
+SEPARATORS = str.maketrans({',': ' ', '|': ' ', '→': ' ', ';': ' '})
+
+# Golden-ratio multiplier of the edge hash (Fibonacci hashing)
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+# Hash set of the transitions of a graph, keyed by source * n + target and
+# mapping to the edge id. Open addressing with linear probing in two NumPy
+# arrays, so a whole batch of (source, target) pairs is looked up at once in
+# expected O(1) per pair.
+class EdgeTable:
+
+    def __init__(self, keys, values):
+        keys = np.asarray(keys, dtype=np.int64)
+        self.bits = max(4, int(2 * len(keys)).bit_length())
+        self.keys = np.full(1 << self.bits, -1, dtype=np.int64)
+        self.values = np.full(1 << self.bits, -1, dtype=np.int32)
+
+        # Insert everything at once; keys whose slot is taken move on a slot
+        pending = np.arange(len(keys))
+        slots = self._slots(keys)
+        while len(pending):
+            free = self.keys[slots] == -1
+            taken, first = np.unique(slots[free], return_index=True)
+            placed = np.flatnonzero(free)[first]
+            self.keys[taken] = keys[pending[placed]]
+            self.values[taken] = np.asarray(values)[pending[placed]]
+            waiting = np.ones(len(pending), dtype=bool)
+            waiting[placed] = False
+            pending, slots = pending[waiting], (slots[waiting] + 1) & self.mask
+
+    @property
+    def mask(self):
+        return (1 << self.bits) - 1
+
+    # Edge id of every key, -1 for keys that are not transitions
+    def lookup(self, keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        found = np.full(len(keys), -1, dtype=np.int32)
+        active = np.arange(len(keys))
+        slots = self._slots(keys)
+        while len(active):
+            stored = self.keys[slots]
+            hit = stored == keys[active]
+            found[active[hit]] = self.values[slots[hit]]
+            probing = ~hit & (stored != -1)
+            active, slots = active[probing], (slots[probing] + 1) & self.mask
+        return found
+
+    def _slots(self, keys):
+        hashed = keys.astype(np.uint64) * HASH_MULTIPLIER
+        return (hashed >> np.uint64(64 - self.bits)).astype(np.int64)
+
+
+# Coverage of a batch of progressions by a graph: how many transitions it
+# has, how often each was used, and which chords and transitions it lacks
+class ValidationReport:
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.progressions = 0
+        self.chords = 0
+        self.transitions = 0
+        self.edge_counts = np.zeros(graph.num_edges, dtype=np.int64)
+        self.unknown_chords = Counter()
+        self.missing_transitions = Counter()
+
+    # Transitions found in the graph
+    @property
+    def known(self):
+        return int(self.edge_counts.sum())
+
+    @property
+    def coverage(self):
+        return self.known / self.transitions if self.transitions else 1.0
+
+    # Add the counts of a report on more progressions of the same graph
+    def merge(self, other):
+        self.progressions += other.progressions
+        self.chords += other.chords
+        self.transitions += other.transitions
+        self.edge_counts += other.edge_counts
+        self.unknown_chords.update(other.unknown_chords)
+        self.missing_transitions.update(other.missing_transitions)
+        return self
+
+    # The most used transitions as (source, target, relation, count)
+    def top_transitions(self, count=10):
+        sources = np.repeat(np.arange(len(self.graph)), np.diff(self.graph.indptr))
+        top = np.argsort(-self.edge_counts, kind='stable')[:count]
+        return [(self.graph.names[sources[edge]], self.graph.names[self.graph.indices[edge]],
+                 self.graph.edge_label(edge), int(self.edge_counts[edge]))
+                for edge in top if self.edge_counts[edge] > 0]
+
+
+# Checks chord progressions against the transitions of a ChordGraph. Chords
+# are matched by name, or by canonical chord ID so that 'E major' and 'Emaj'
+# are E. Single progressions get a per-transition answer; files are streamed
+# in chunks of lines, each checked with a few NumPy operations, so memory
+# stays flat and millions of progressions take seconds.
+class ProgressionValidator:
+
+    def __init__(self, graph):
+        self.graph = graph
+        n = len(graph)
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.indptr))
+        self.edges = EdgeTable(sources * n + graph.indices, np.arange(graph.num_edges))
+        self._canonical = {}
+        for chord_id, name in enumerate(graph.names):
+            self._canonical.setdefault(canonical_chord_id(name), chord_id)
+        self._canonical.pop(None, None)
+        self._token_ids = dict(graph.index)
+
+    # Chord id of a name as written in a progression, or -1. Only names of
+    # chords are remembered, so junk in uploads cannot grow the cache.
+    def chord_id(self, token):
+        chord_id = self._token_ids.get(token)
+        if chord_id is None:
+            chord_id = self._canonical.get(canonical_chord_id(token), -1)
+            if chord_id >= 0:
+                self._token_ids[token] = chord_id
+        return chord_id
+
+    # (chord, next chord, relation) for each adjacent pair of a progression
+    # given as a string or list of names; relation is None if the graph has
+    # no such transition or does not know one of the chords
+    def check(self, progression):
+        if isinstance(progression, str):
+            progression = progression.translate(SEPARATORS).split()
+        ids = np.array([self.chord_id(token) for token in progression], dtype=np.int64)
+        edges = np.full(max(len(ids) - 1, 0), -1, dtype=np.int32)
+        known = (ids[:-1] >= 0) & (ids[1:] >= 0)
+        edges[known] = self.edges.lookup(ids[:-1][known] * len(self.graph) + ids[1:][known])
+        return [(source, target, self.graph.edge_label(edge) if edge >= 0 else None)
+                for source, target, edge in zip(progression, progression[1:], edges.tolist())]
+
+    # Report on progressions given one per line, from any iterable of str
+    def validate_lines(self, lines, chunk_lines=CHUNK_LINES):
+        report = ValidationReport(self.graph)
+        lines = iter(lines)
+        while True:
+            chunk = list(itertools.islice(lines, chunk_lines))
+            if not chunk:
+                return report
+            self._validate_chunk(chunk, report)
+
+    # Report on a text or binary file of progressions, one per line; with
+    # csv_rows=True each line is a CSV row with one chord per column (see csv_lines)
+    def validate_file(self, file, chunk_lines=CHUNK_LINES, csv_rows=False):
+        if not isinstance(file, io.TextIOBase):
+            file = io.TextIOWrapper(file, encoding='utf-8', errors='replace', newline='')
+        return self.validate_lines(self.csv_lines(file) if csv_rows else file, chunk_lines)
+
+    # Progressions of CSV rows with one chord per column, as lines for
+    # validate_lines. Fields are parsed with the csv module, so quoted chords
+    # lose their quotes. With header=True a first row without a single chord
+    # of the graph is a header and is skipped.
+    def csv_lines(self, lines, header=True):
+        for row in csv.reader(lines):
+            chords = [field.strip() for field in row if field.strip()]
+            if header:
+                header = False
+                if not any(self.chord_id(chord) >= 0 for chord in chords):
+                    continue
+            yield " ".join(chords)
+
+    def _validate_chunk(self, chunk, report):
+        tokens = []
+        lengths = []
+        for line in chunk:
+            line_tokens = line.translate(SEPARATORS).split()
+            if line_tokens:
+                tokens.extend(line_tokens)
+                lengths.append(len(line_tokens))
+        if not tokens:
+            return
+        # Each distinct token is resolved once per chunk
+        chunk_ids = {token: self.chord_id(token) for token in set(tokens)}
+        ids = np.array([chunk_ids[token] for token in tokens], dtype=np.int64)
+
+        # Adjacent pairs within a line: every position except each line's last
+        lengths = np.array(lengths)
+        pair = np.ones(len(ids), dtype=bool)
+        pair[np.cumsum(lengths) - 1] = False
+        pair = pair[:-1]
+        sources, targets = ids[:-1][pair], ids[1:][pair]
+
+        both_known = (sources >= 0) & (targets >= 0)
+        edges = self.edges.lookup(sources[both_known] * len(self.graph) + targets[both_known])
+        report.edge_counts += np.bincount(edges[edges >= 0], minlength=self.graph.num_edges)
+        missing = np.stack([sources[both_known][edges < 0], targets[both_known][edges < 0]], axis=1)
+        if len(missing):
+            pairs, counts = np.unique(missing, axis=0, return_counts=True)
+            for (source, target), count in zip(pairs.tolist(), counts.tolist()):
+                report.missing_transitions[(self.graph.names[source], self.graph.names[target])] += count
+        report.unknown_chords.update(tokens[i] for i in np.flatnonzero(ids < 0).tolist())
+
+        report.progressions += len(lengths)
+        report.chords += len(ids)
+        report.transitions += int(pair.sum())
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+from atomic_file import write_atomic
+
+
+# Rendered pages on disk, one file per view under a directory per graph
+# version (the first element of the key). File names are a hash of the full
+# key, so they survive restarts and can be written by other processes. Only
+# prerendered views are written here; each graph source records the version
+# it was last prerendered for, and the pages of its older versions are
+# deleted then.
+class DiskRenderCache:
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path_for(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, str(key[0]), f"{digest}.html")
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, html):
+        write_atomic(self.path_for(key), html)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path_for(key))
+
+    # Record `version` as the current graph of `source` and delete the pages
+    # of the version it replaces, unless another source still uses it
+    def set_current(self, source, version):
+        marker = os.path.join(self.cache_dir, hashlib.sha1(source.encode('utf-8')).hexdigest()[:12] + ".current")
+        previous = self._read_marker(marker)
+        if previous == version:
+            return
+        write_atomic(marker, version)
+        if previous is not None and previous not in self._current_versions():
+            shutil.rmtree(os.path.join(self.cache_dir, previous), ignore_errors=True)
+
+    def _current_versions(self):
+        return {self._read_marker(os.path.join(self.cache_dir, name))
+                for name in os.listdir(self.cache_dir) if name.endswith(".current")}
+
+    def _read_marker(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+
+# Least-recently-used cache for rendered HTML pages with a memory budget in
+# bytes. Shared by all sessions of the process, so every access is locked.
+# With a DiskRenderCache behind it, memory misses are looked up on disk
+# before anything is rendered. Pages rendered here stay in memory only, so
+# the disk holds a bounded set of prerendered views.
+class RenderCache:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk=None):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html):
+        size = len(html.encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (html, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    # Return the cached page for key, rendering and storing it on a miss
+    def get_or_render(self, key, render):
+        html = self.get(key)
+        if html is None and self.disk is not None:
+            html = self.disk.get(key)
+            if html is not None:
+                self.disk_hits += 1
+                self.put(key, html)
+        if html is None:
+            html = render()
+            self.put(key, html)
+        return html
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,89 @@
+import hashlib
+import html
+import io
+import os
+
+from PIL import Image
+
+from image_variants import DISPLAY_SIZES, ENCODINGS, PIXEL_RATIO, find_variant, save_smallest, static_url
+from network_render import STATIC_DIR
+
+
+# Built atlases are written here, so Streamlit serves them as static files
+ATLAS_DIR = os.path.join(STATIC_DIR, "atlas")
+
+# Size of one chord diagram in the strip, in CSS pixels. Diagrams are stored
+# at a higher resolution so they stay sharp on high-density screens.
+CELL_WIDTH, CELL_HEIGHT = DISPLAY_SIZES['strip']
+ATLAS_SCALE = PIXEL_RATIO
+ATLAS_COLUMNS = 8
+
+
+# Every chord diagram packed into one PNG, and where each chord sits in it
+class SpriteAtlas:
+
+    def __init__(self, url, offsets, columns, rows):
+        self.url = url
+        self.offsets = offsets
+        self.columns = columns
+        self.rows = rows
+
+    def __contains__(self, chord):
+        return chord in self.offsets
+
+    # HTML for a row of diagrams of the given chords. Chords missing from the
+    # atlas are drawn from `diagrams` ({chord: URL} of generated SVGs) if they
+    # are there and skipped otherwise. The page only carries offsets and URLs;
+    # the atlas and the SVGs are static files the browser downloads once.
+    def strip_html(self, chords, diagrams=None):
+        diagrams = diagrams or {}
+        cells = []
+        for chord in chords:
+            if chord in self.offsets:
+                x, y = self.offsets[chord]
+                image = f'<div class="chord-sprite" style="background-position: -{x}px -{y}px;"></div>'
+            elif chord in diagrams:
+                image = (f'<img src="{html.escape(diagrams[chord])}" width="{CELL_WIDTH}" height="{CELL_HEIGHT}" '
+                         f'alt="{html.escape(chord)}" loading="lazy">')
+            else:
+                continue
+            cells.append(f'<figure style="text-align: center;">{image}'
+                         f'<figcaption>{html.escape(chord)}</figcaption></figure>')
+        return (f'<style>.chord-sprite {{ width: {CELL_WIDTH}px; height: {CELL_HEIGHT}px; '
+                f'background-image: url("{self.url}"); '
+                f'background-size: {self.columns * CELL_WIDTH}px {self.rows * CELL_HEIGHT}px; }}</style>'
+                f'<div style="display: flex; flex-wrap: wrap; justify-content: space-around;">'
+                + "".join(cells) + '</div>')
+
+
+# Pack the raster diagrams the asset manifest has for the given chords into
+# one atlas image under atlas_dir, saved in whichever of ENCODINGS is
+# smallest. The file name is a hash of the inputs, so an atlas is only built
+# once and browsers can keep it until the diagrams change. SVG images are
+# left out; they are sharp at any size on their own.
+def build_sprite_atlas(manifest, chords, atlas_dir=ATLAS_DIR):
+    chords = sorted(chord for chord in set(chords)
+                    if chord in manifest and manifest.mime_type(chord) != "image/svg+xml")
+    digest = hashlib.sha1(repr((CELL_WIDTH, CELL_HEIGHT, ATLAS_SCALE, ATLAS_COLUMNS, ENCODINGS)).encode('utf-8'))
+    for chord in chords:
+        digest.update(chord.encode('utf-8'))
+        digest.update(manifest.digest(chord).encode('ascii'))
+    stem = os.path.join(atlas_dir, f"chords-{digest.hexdigest()[:16]}")
+
+    columns = min(ATLAS_COLUMNS, len(chords)) or 1
+    rows = (len(chords) + columns - 1) // columns or 1
+    offsets = {chord: ((i % columns) * CELL_WIDTH, (i // columns) * CELL_HEIGHT) for i, chord in enumerate(chords)}
+
+    path = find_variant(stem)
+    if path is None:
+        cell = (CELL_WIDTH * ATLAS_SCALE, CELL_HEIGHT * ATLAS_SCALE)
+        atlas = Image.new("RGBA", (columns * cell[0], rows * cell[1]), (0, 0, 0, 0))
+        for chord in chords:
+            with Image.open(io.BytesIO(manifest.read(chord))) as image:
+                image = image.convert("RGBA")
+                image.thumbnail(cell, Image.LANCZOS)
+                x, y = offsets[chord]
+                atlas.paste(image, (x * ATLAS_SCALE + (cell[0] - image.width) // 2,
+                                    y * ATLAS_SCALE + (cell[1] - image.height) // 2))
+        path = save_smallest(atlas, stem)
+    return SpriteAtlas(static_url(path), offsets, columns, rows)
@@ -0,0 +1,104 @@
+// Frontend of the chord network component (network_component.py). One
+// vis-network instance lives as long as the iframe. Every render message
+// carries the nodes and edges to update or remove since revision `base`,
+// which is applied only if it is the revision shown here. A render with base
+// 0 replaces everything. Any other mismatch (a reloaded iframe, a missed
+// rerun) asks Python for a full snapshot.
+//
+// The component value reports the last sync request and the last clicked
+// chord. Each carries a fresh token, so repeating an event still changes the
+// value and triggers a rerun.
+var nodes = new vis.DataSet();
+var edges = new vis.DataSet();
+var network = null;
+var hover = null;
+var detail = null;
+var lod = null;
+var revision = 0;
+var syncRequested = false;
+var syncToken = null;
+var click = null;
+
+function sendMessage(type, data) {
+    window.parent.postMessage(Object.assign({isStreamlitMessage: true, type: type}, data), '*');
+}
+
+function newToken() {
+    return Date.now() + '-' + Math.random();
+}
+
+function sendValue() {
+    var value = {sync: syncToken, click: click};
+    sendMessage('streamlit:setComponentValue', {value: value, dataType: 'json'});
+}
+
+function requestSync() {
+    if (!syncRequested) {
+        syncRequested = true;
+        syncToken = newToken();
+        sendValue();
+    }
+}
+
+function onClick(params) {
+    if (params.nodes.length > 0 && !network.isCluster(params.nodes[0])) {
+        click = {chord: params.nodes[0], token: newToken()};
+        sendValue();
+    }
+}
+
+function reset(args) {
+    var container = document.getElementById('mynetwork');
+    container.style.width = args.width;
+    container.style.height = args.height;
+    container.style.backgroundColor = args.bgcolor;
+    nodes.clear();
+    edges.clear();
+    if (network === null) {
+        network = new vis.Network(container, {nodes: nodes, edges: edges}, JSON.parse(args.options));
+        network.on('click', onClick);
+        hover = addChordDiagramHover(network, container);
+        detail = addLevelOfDetail(network, nodes);
+    } else {
+        network.setOptions(JSON.parse(args.options));
+    }
+    lod = JSON.parse(args.lod);
+    sendMessage('streamlit:setFrameHeight', {height: container.offsetHeight + 2});
+}
+
+function render(args) {
+    if (args.revision === revision) {
+        return;
+    }
+    // Clusters are opened while the data changes and formed again afterwards
+    if (detail !== null) {
+        detail.setClusters(null, null);
+    }
+    if (args.base === 0) {
+        reset(args);
+        syncRequested = false;
+    } else if (args.base !== revision) {
+        requestSync();
+        return;
+    }
+    nodes.remove(args.removed_nodes);
+    edges.remove(args.removed_edges);
+    nodes.update(JSON.parse(args.nodes));
+    // Changed edges are replaced, not merged, so a width or colour they no
+    // longer have does not stay behind
+    var changedEdges = JSON.parse(args.edges);
+    edges.remove(changedEdges.map(function (edge) { return edge.id; }));
+    edges.add(changedEdges);
+    hover.setMap(args.diagrams);
+    detail.setClusters(lod, args.selected);
+    revision = args.revision;
+    focusChordNetwork(network, args.selected, args.base !== 0);
+    detail.update();
+}
+
+window.addEventListener('message', function (event) {
+    if (event.data.type === 'streamlit:render') {
+        render(event.data.args);
+    }
+});
+sendMessage('streamlit:componentReady', {apiVersion: 1});
@@ -0,0 +1,173 @@
+// Shared by every chord network page and the chord network component.
+// Static pages only carry their node and edge data and call
+// drawChordNetwork once vis-network has loaded.
+//
+// Nodes arrive with fixed coordinates from the layout of the whole graph, so
+// a filtered view only zooms to the chords it shows. The selected chord, if
+// any, is highlighted. `diagrams` is the URL of the hover diagram map and
+// `lod` the level of detail settings, either may be null.
+function drawChordNetwork(nodes, edges, options, selected, diagrams, lod) {
+    var container = document.getElementById('mynetwork');
+    var data = {nodes: new vis.DataSet(nodes), edges: new vis.DataSet(edges)};
+    var network = new vis.Network(container, data, options);
+    addChordDiagramHover(network, container).setMap(diagrams);
+    var detail = addLevelOfDetail(network, data.nodes);
+    detail.setClusters(lod, selected);
+    focusChordNetwork(network, selected, false);
+    detail.update();
+    return network;
+}
+
+function focusChordNetwork(network, selected, animate) {
+    network.fit({animation: animate ? {duration: 300, easingFunction: 'easeInOutQuad'} : false});
+    if (selected !== null) {
+        network.selectNodes([selected]);
+    } else {
+        network.unselectAll();
+    }
+}
+
+// Show a chord's diagram next to the pointer while a node is hovered. Pages
+// only know the URL of a {chord: image URL} map: the map is fetched on the
+// first hover and each image on the first hover of its chord, and both are
+// kept for the life of the page.
+function addChordDiagramHover(network, container) {
+    var box = document.createElement('div');
+    box.style.cssText = 'position: absolute; display: none; pointer-events: none; z-index: 10;';
+    container.appendChild(box);
+
+    var mapUrl = null;
+    var map = null;
+    var images = {};
+    var hovered = null;
+
+    function show(chord, pointer) {
+        if (chord !== hovered) {
+            return;
+        }
+        var url = map && map[chord];
+        if (!url) {
+            box.style.display = 'none';
+            return;
+        }
+        if (!images[url]) {
+            // Diagrams keep their aspect ratio inside the 100x100 box
+            images[url] = new Image();
+            images[url].style.cssText = 'width: 100px; height: 100px; object-fit: contain;';
+            images[url].src = url;
+        }
+        box.replaceChildren(images[url]);
+        box.style.left = (pointer.x + 16) + 'px';
+        box.style.top = Math.max(pointer.y - 116, 0) + 'px';
+        box.style.display = 'block';
+    }
+
+    network.on('hoverNode', function (params) {
+        hovered = params.node;
+        if (map !== null || mapUrl === null) {
+            show(params.node, params.pointer.DOM);
+            return;
+        }
+        var requested = mapUrl;
+        fetch(requested).then(function (response) {
+            return response.json();
+        }).then(function (loaded) {
+            if (requested === mapUrl) {
+                map = loaded;
+                show(params.node, params.pointer.DOM);
+            }
+        });
+    });
+    network.on('blurNode', function () {
+        hovered = null;
+        box.style.display = 'none';
+    });
+    network.on('dragStart', function () {
+        box.style.display = 'none';
+    });
+
+    return {
+        setMap: function (url) {
+            if (url !== mapUrl) {
+                mapUrl = url;
+                map = null;
+            }
+        }
+    };
+}
+
+// Level of detail: while a big view is zoomed out, the chords of each cluster
+// sent by the server collapse into one node and the edges between two
+// clusters into one edge. Zooming back in expands every cluster; clicking a
+// cluster expands just that one. The selected chord and the hubs (the most
+// central chords) are never collapsed.
+function addLevelOfDetail(network, nodes) {
+    var lod = null;
+    var selected = null;
+    var collapsed = false;
+
+    function collapse() {
+        lod.clusters.forEach(function (cluster) {
+            var joins = function (options) {
+                return options[cluster.by] === cluster.value && !options.hub && options.id !== selected;
+            };
+            var count = nodes.get({filter: joins}).length;
+            if (count < 2) {
+                return;
+            }
+            network.cluster({
+                joinCondition: joins,
+                clusterNodeProperties: {
+                    id: cluster.id,
+                    label: cluster.label + ' (' + count + ')',
+                    title: count + ' ' + cluster.label + ' chords, click to expand',
+                    color: cluster.color,
+                    shape: 'dot',
+                    size: 10 + 4 * Math.sqrt(count),
+                    font: {size: 28}
+                },
+                clusterEdgeProperties: {label: ''}
+            });
+        });
+        collapsed = true;
+    }
+
+    function expand() {
+        if (lod !== null) {
+            lod.clusters.forEach(function (cluster) {
+                if (network.isCluster(cluster.id)) {
+                    network.openCluster(cluster.id);
+                }
+            });
+        }
+        collapsed = false;
+    }
+
+    function update() {
+        var zoomedOut = lod !== null && nodes.length >= lod.min_chords && network.getScale() < lod.scale;
+        if (zoomedOut && !collapsed) {
+            collapse();
+        } else if (!zoomedOut && collapsed) {
+            expand();
+        }
+    }
+
+    network.on('zoom', update);
+    network.on('animationFinished', update);
+    network.on('click', function (params) {
+        if (params.nodes.length > 0 && network.isCluster(params.nodes[0])) {
+            network.openCluster(params.nodes[0]);
+        }
+    });
+
+    return {
+        // Open every cluster, e.g. before the nodes change, and use these
+        // settings and selected chord from the next update on
+        setClusters: function (settings, chord) {
+            expand();
+            lod = settings;
+            selected = chord;
+        },
+        update: update
+    };
+}
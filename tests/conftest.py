@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chord_graph import ChordGraph  # noqa: E402
+from chord_paths import RELATION_WEIGHTS  # noqa: E402
+
+
+# A directed graph of n chords with every transition present with
+# probability p, without loops or repeated transitions. Relations are drawn
+# from the path planner's keywords, so transitions have different costs.
+# The targets of each chord are shuffled: data files and the generated graph
+# do not list transitions in id order either.
+def random_graph(rng, n, p):
+    labels = [keyword for keyword, _ in RELATION_WEIGHTS] + ["other"]
+    adjacency = rng.random((n, n)) < p
+    np.fill_diagonal(adjacency, False)
+    sources, targets = np.nonzero(adjacency)
+    order = np.lexsort((rng.random(len(targets)), sources))
+    sources, targets = sources[order], targets[order]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n))))
+    return ChordGraph([f"chord{i}" for i in range(n)], ["type"] * n, ["#000000"] * n,
+                      indptr, targets, rng.integers(len(labels), size=len(targets)), labels)
+
+
+# 40 random graphs, from sparse ones with isolated chords to dense ones
+@pytest.fixture(scope="session")
+def random_graphs():
+    rng = np.random.default_rng(0)
+    return [random_graph(rng, int(rng.integers(2, 30)), rng.uniform(0.05, 0.5)) for _ in range(40)]
+
+
+# The same graph as a networkx DiGraph whose edges carry `weights`
+def to_networkx(graph, weights=None):
+    nx = pytest.importorskip("networkx")
+    digraph = nx.DiGraph()
+    digraph.add_nodes_from(range(len(graph)))
+    sources = np.repeat(np.arange(len(graph)), np.diff(graph.indptr))
+    for edge, (source, target) in enumerate(zip(sources.tolist(), graph.indices.tolist())):
+        digraph.add_edge(source, target, weight=1.0 if weights is None else float(weights[edge]))
+    return digraph
@@ -0,0 +1,40 @@
+import json
+import shutil
+
+import pytest
+
+from chord_data import ChordDataError, ProgressionLibrary, load_progression
+
+CHORDS = {
+    "E7": {"type": "Dominant 7th", "color": "#FF6B6B", "related": {"A7": "Fourth"}},
+    "A7": {"type": "Dominant 7th", "color": "#FF6B6B", "related": {}},
+}
+
+
+def test_yaml_syntax_errors_name_file_and_line(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "broken.yaml"
+    path.write_text("E7:\n  type: Dominant 7th\n  related: [A7\n")
+    with pytest.raises(ChordDataError, match=r"broken\.yaml: line \d+"):
+        load_progression(str(path))
+
+
+def test_last_good_graph_survives_bad_edits_and_missing_files(tmp_path):
+    path = tmp_path / "progression.json"
+    path.write_text(json.dumps(CHORDS))
+    library = ProgressionLibrary(cache_dir=str(tmp_path / "cache"))
+    graph, error = library.get_last_good(str(path))
+    assert error is None and graph.names == ["E7", "A7"]
+
+    path.write_text("{broken")
+    broken, error = library.get_last_good(str(path))
+    assert broken is graph and isinstance(error, ChordDataError)
+
+    shutil.move(path, tmp_path / "progression.json~")
+    missing, error = library.get_last_good(str(path))
+    assert missing is graph and isinstance(error, OSError)
+
+
+def test_missing_file_without_last_good_graph(tmp_path):
+    graph, error = ProgressionLibrary(cache_dir=str(tmp_path)).get_last_good(str(tmp_path / "none.json"))
+    assert graph is None and isinstance(error, FileNotFoundError)
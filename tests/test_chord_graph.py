@@ -0,0 +1,13 @@
+import pytest
+
+from chord_graph import UNREACHABLE
+from conftest import to_networkx
+
+
+def test_hop_distances_match_networkx(random_graphs):
+    nx = pytest.importorskip("networkx")
+    for graph in random_graphs:
+        lengths = dict(nx.all_pairs_shortest_path_length(to_networkx(graph).to_undirected()))
+        for source in range(len(graph)):
+            for target in range(len(graph)):
+                assert graph.hop_distances[source, target] == lengths[source].get(target, UNREACHABLE)
@@ -0,0 +1,32 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from chord_paths import PathPlanner
+from conftest import to_networkx
+
+K = 5
+
+
+def test_k_shortest_paths_match_networkx(random_graphs):
+    nx = pytest.importorskip("networkx")
+    for graph in random_graphs:
+        planner = PathPlanner(graph)
+        digraph = to_networkx(graph, planner.weights)
+        for source, target in itertools.islice(itertools.permutations(range(len(graph)), 2), 30):
+            found = planner.paths(graph.names[source], graph.names[target], k=K)
+            if not nx.has_path(digraph, source, target):
+                assert found == []
+                continue
+            expected = [nx.path_weight(digraph, path, "weight")
+                        for path in itertools.islice(nx.shortest_simple_paths(digraph, source, target, "weight"), K)]
+            # Paths of equal cost may come in any order, so compare the costs
+            # and check every path on its own
+            assert np.allclose([cost for cost, _ in found], expected)
+            paths = [tuple(graph.index[name] for name in names) for _, names in found]
+            assert len(set(paths)) == len(paths)
+            for (cost, _), path in zip(found, paths):
+                assert path[0] == source and path[-1] == target
+                assert len(set(path)) == len(path)
+                assert np.isclose(nx.path_weight(digraph, path, "weight"), cost)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from chord_data import read_artifact, write_artifact
+from chord_theory import generate_chord_graph
+from conftest import to_networkx
+from graph_metrics import DAMPING
+
+
+def test_pagerank_matches_networkx(random_graphs):
+    nx = pytest.importorskip("networkx")
+    for graph in random_graphs:
+        expected = nx.pagerank(to_networkx(graph), alpha=DAMPING, tol=1e-12, max_iter=1000)
+        assert np.allclose(graph.metrics['pagerank'], [expected[i] for i in range(len(graph))], atol=1e-8)
+
+
+def test_betweenness_matches_networkx(random_graphs):
+    nx = pytest.importorskip("networkx")
+    for graph in random_graphs:
+        expected = nx.betweenness_centrality(to_networkx(graph), normalized=True)
+        assert np.allclose(graph.metrics['betweenness'], [expected[i] for i in range(len(graph))])
+
+
+def test_degrees_match_networkx(random_graphs):
+    for graph in random_graphs:
+        digraph = to_networkx(graph)
+        assert graph.metrics['in_degree'].tolist() == [digraph.in_degree(i) for i in range(len(graph))]
+        assert graph.metrics['out_degree'].tolist() == [digraph.out_degree(i) for i in range(len(graph))]
+
+
+def test_communities_are_numbered_by_size(random_graphs):
+    for graph in random_graphs:
+        sizes = np.bincount(graph.metrics['community'])
+        assert (sizes > 0).all()
+        assert (np.diff(sizes) <= 0).all()
+
+
+def test_metrics_leave_the_graph_unchanged(tmp_path):
+    generated = generate_chord_graph()
+    write_artifact(generated, tmp_path / "generated.cgraph")
+    for graph in (generated, read_artifact(tmp_path / "generated.cgraph")):
+        indices = graph.indices.copy()
+        edge_labels = graph.edge_labels.copy()
+        graph.metrics
+        assert graph.indices.tolist() == indices.tolist()
+        assert graph.edge_labels.tolist() == edge_labels.tolist()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from progression_sampler import ProgressionSampler, _alias_tables
+
+
+# Probability of drawing every edge of its row from alias tables: a slot is
+# picked uniformly, then kept or swapped for its alias
+def alias_probabilities(indptr, accept, alias):
+    degrees = np.diff(indptr)
+    slot_share = 1.0 / np.repeat(degrees, degrees)
+    probabilities = accept * slot_share
+    np.add.at(probabilities, alias, (1 - accept) * slot_share)
+    return probabilities
+
+
+def test_alias_tables_reproduce_weights(random_graphs):
+    rng = np.random.default_rng(1)
+    for graph in random_graphs:
+        weights = rng.random(graph.num_edges) * (rng.random(graph.num_edges) < 0.8)
+        accept, alias = _alias_tables(graph.indptr, weights)
+        probabilities = alias_probabilities(graph.indptr, accept, alias)
+        for row in range(len(graph)):
+            start, end = graph.indptr[row], graph.indptr[row + 1]
+            if start == end:
+                continue
+            # Aliases stay within the row
+            assert ((alias[start:end] >= start) & (alias[start:end] < end)).all()
+            total = weights[start:end].sum()
+            expected = weights[start:end] / total if total > 0 else np.full(end - start, 1 / (end - start))
+            assert np.allclose(probabilities[start:end], expected)
+
+
+def test_sampled_steps_follow_weights(random_graphs):
+    graph = max(random_graphs, key=lambda graph: graph.num_edges)
+    start = int(np.argmax(np.diff(graph.indptr)))
+    edges = np.arange(graph.indptr[start], graph.indptr[start + 1])
+    weights = np.ones(graph.num_edges)
+    weights[edges] = np.arange(1, len(edges) + 1)
+    sampler = ProgressionSampler(graph, weights)
+    steps = sampler.sample_ids(graph.names[start], 2, count=200000, seed=0)[:, 1]
+    frequencies = np.bincount(steps, minlength=len(graph))[graph.indices[edges]] / len(steps)
+    assert np.allclose(frequencies, weights[edges] / weights[edges].sum(), atol=0.01)
@@ -0,0 +1,61 @@
+import io
+
+import numpy as np
+
+from chord_graph import ChordGraph
+from corpus_counts import count_corpus
+from progression_validator import EdgeTable, ProgressionValidator
+
+
+def test_edge_table_round_trip():
+    rng = np.random.default_rng(0)
+    for size in (0, 1, 7, 100, 5000):
+        keys = rng.choice(10 ** 9, size=2 * size, replace=False)
+        stored, missing = keys[:size], keys[size:]
+        table = EdgeTable(stored, np.arange(size))
+        assert table.lookup(stored).tolist() == list(range(size))
+        assert (table.lookup(missing) == -1).all()
+
+
+def test_edge_table_probes_past_collisions():
+    # Consecutive keys of a dense graph with a small table: many share a slot
+    keys = np.arange(64, dtype=np.int64)
+    table = EdgeTable(keys, keys[::-1])
+    assert table.lookup(keys).tolist() == keys[::-1].tolist()
+    assert table.lookup([64, 65, -5 + 10 ** 6]).tolist() == [-1, -1, -1]
+
+
+def test_validator_finds_every_transition(random_graphs):
+    for graph in random_graphs:
+        validator = ProgressionValidator(graph)
+        n = len(graph)
+        sources = np.repeat(np.arange(n), np.diff(graph.indptr))
+        edges = validator.edges.lookup(np.arange(n * n))
+        expected = np.full(n * n, -1)
+        expected[sources * n + graph.indices] = np.arange(graph.num_edges)
+        assert edges.tolist() == expected.tolist()
+
+
+CSV_CORPUS = 'song,c1,c2,c3\n"E7","A7","E7"\nE7,B7\n'
+
+
+def blues_graph():
+    return ChordGraph.from_dict({
+        "E7": {"type": "Dominant 7th", "color": "#FF6B6B", "related": {"A7": "Fourth", "B7": "Fifth"}},
+        "A7": {"type": "Dominant 7th", "color": "#FF6B6B", "related": {"E7": "Back to the tonic"}},
+        "B7": {"type": "Dominant 7th", "color": "#FF6B6B", "related": {}},
+    })
+
+
+def test_csv_files_skip_the_header_and_unquote_chords():
+    report = ProgressionValidator(blues_graph()).validate_file(io.BytesIO(CSV_CORPUS.encode()), csv_rows=True)
+    assert (report.progressions, report.known, report.transitions) == (2, 3, 3)
+    assert not report.unknown_chords
+
+
+def test_csv_corpus_counts_skip_the_header_and_unquote_chords(tmp_path):
+    path = tmp_path / "corpus.csv"
+    path.write_text(CSV_CORPUS)
+    report = count_corpus(blues_graph(), str(path), workers=1)
+    assert (report.progressions, report.known) == (2, 3)
+    assert not report.unknown_chords
@@ -0,0 +1,107 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from chord_assets import NOTE_NUMBERS, parse_chord
+from chord_graph import ChordGraph
+from chord_theory import PITCH_NAMES
+
+
+# Keys are named like the pitch classes; a graph can be shown in any of them
+KEYS = PITCH_NAMES
+
+SHARP_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+FLAT_NAMES = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+
+# Major keys written with flats; the others are written with sharps
+FLAT_KEYS = {0: False, 1: True, 2: False, 3: True, 4: False, 5: True,
+             6: False, 7: False, 8: True, 9: False, 10: True, 11: False}
+
+# SPELLING[key][pitch class]: how a note is written in a key, and the other
+# way of writing it for when that name is taken
+SPELLING = [FLAT_NAMES if FLAT_KEYS[key] else SHARP_NAMES for key in range(12)]
+RESPELLING = [SHARP_NAMES if FLAT_KEYS[key] else FLAT_NAMES for key in range(12)]
+
+# TRANSPOSE[shift][pitch class]: the pitch class moved up by `shift` semitones
+TRANSPOSE = (np.arange(12)[:, None] + np.arange(12)[None, :]) % 12
+
+# A note name at the start of a chord name
+ROOT = re.compile(r"^([A-G])([#b♯♭]?)")
+
+# A note name standing on its own in a description, like the E of
+# "Fifth progression (V) in terms of E" or the Bb of "leading to BbM"
+NOTE_IN_TEXT = re.compile(r"(?<![\w#♯♭])([A-G])([#b♯♭]?)(?=M?(?![\w#♯♭]))")
+
+ACCIDENTALS = {'': 0, '#': 1, '♯': 1, 'b': -1, '♭': -1}
+
+
+# Pitch class of the key a graph is written in: the root of its first chord,
+# which the chord data files list first as the tonic
+def home_key(graph):
+    for name in graph.names:
+        parsed = parse_chord(name)
+        if parsed is not None:
+            return parsed[0]
+    return 0
+
+
+# A chord name moved by `shift` semitones and spelled for `key`, keeping the
+# rest of the name as written ('FMajor' up 2 in D is 'GMajor'). Names that
+# are not chords are kept.
+def transpose_chord(name, shift, key, spelling=SPELLING):
+    if parse_chord(name) is None:
+        return name
+    return ROOT.sub(lambda match: _transpose_note(match, shift, key, spelling), name, count=1)
+
+
+# Every standalone note name of a text moved by `shift` semitones
+def transpose_text(text, shift, key):
+    return NOTE_IN_TEXT.sub(lambda match: _transpose_note(match, shift, key, SPELLING), text)
+
+
+def _transpose_note(match, shift, key, spelling):
+    pitch = (NOTE_NUMBERS[match.group(1)] + ACCIDENTALS[match.group(2)]) % 12
+    return spelling[key][TRANSPOSE[shift][pitch]]
+
+
+# A graph moved to another key: chord names, chord types and relations are
+# transposed and spelled for the key, the transitions stay as they are. Built
+# once per graph and key; the transposed graph shares the hop distances,
+# layout and metrics of the original, so switching keys is a cache lookup and
+# chords keep their place in the network. `key` is a name from KEYS.
+@lru_cache(maxsize=64)
+def transposed_graph(graph, key):
+    key = KEYS.index(key)
+    shift = (key - home_key(graph)) % 12
+    if shift == 0:
+        return graph
+
+    names = []
+    taken = set()
+    for name in graph.names:
+        new_name = transpose_chord(name, shift, key)
+        if new_name in taken:
+            new_name = transpose_chord(name, shift, key, RESPELLING)
+        if new_name in taken:
+            raise ValueError(f"{name!r} and another chord are both {new_name!r} in {KEYS[key]}")
+        taken.add(new_name)
+        names.append(new_name)
+
+    transposed = ChordGraph(names, [transpose_text(text, shift, key) for text in graph.types], graph.colors,
+                            graph.indptr, graph.indices, graph.edge_labels,
+                            [transpose_text(label, shift, key) for label in graph.labels])
+    transposed._hop_distances = graph.hop_distances
+    transposed._layout = graph.layout
+    transposed._metrics = graph.metrics
+    return transposed
+
+
+# Name in `new_key` of the chord called `chord` in `old_key`, both views of
+# `graph`, or None if the chord is not in it. Chord ids are the same in
+# every key, so the apps use this to keep the focused chord on a key change.
+def move_to_key(graph, chord, old_key, new_key):
+    old_graph = transposed_graph(graph, old_key)
+    if chord not in old_graph.index:
+        return None
+    return transposed_graph(graph, new_key).names[old_graph.index[chord]]
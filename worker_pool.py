@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+# State of the current worker process, set once per worker by init_worker so
+# large arguments such as a graph are sent once per worker instead of once
+# per task
+worker = {}
+
+
+# Fill `worker` with the dict returned by setup(*args). Also called directly
+# to run a pool's tasks in the current process.
+def init_worker(setup, *args):
+    worker.clear()
+    worker.update(setup(*args))
+
+
+# Process pool whose workers are set up with init_worker(setup, *args).
+# `setup` must be a module-level function so it can be sent to the workers.
+def worker_pool(setup, *args, workers=None):
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                               initializer=init_worker, initargs=(setup, *args))
+
+
+# Streamlit runs the app script as __main__, so worker processes must not be
+# started from inside it. Apps run the module that uses a pool as a script in
+# a separate Python process instead: start_script returns the running
+# subprocess.Popen, run_script waits for it like subprocess.run.
+def _script_command(script, args):
+    return [sys.executable, os.path.abspath(script), *args]
+
+
+def start_script(script, *args, **kwargs):
+    return subprocess.Popen(_script_command(script, args), **kwargs)
+
+
+def run_script(script, *args, **kwargs):
+    return subprocess.run(_script_command(script, args), **kwargs)